@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.agent_transport import AGENT_RESPONSE_TIMEOUT
+from app.db.database import SessionLocal
+from app.models.models import Agent, AgentMatchStat, Match
+
+logger = logging.getLogger(__name__)
+
+# Seconds between periodic roll-ups of the agent stats ledger
+AGENT_STATS_AGGREGATE_INTERVAL = float(os.getenv("AGENT_STATS_AGGREGATE_INTERVAL", "10"))
+
+# Ledger rows rolled up per transaction
+AGENT_STATS_BATCH_SIZE = 10000
+
+# Service level agents are held to in the SLO report
+AGENT_SLO_P95_MS = float(os.getenv("AGENT_SLO_P95_MS", "150"))
+AGENT_SLO_TIMEOUT_RATE = float(os.getenv("AGENT_SLO_TIMEOUT_RATE", "0.01"))
+AGENT_SLO_ERROR_RATE = float(os.getenv("AGENT_SLO_ERROR_RATE", "0.01"))
+
+
+def aggregate_agent_stats(db: Session, batch_size: int = AGENT_STATS_BATCH_SIZE) -> int:
+    """
+    Roll unaggregated ledger rows up into the Agent stats columns.
+    Rows are claimed with SKIP LOCKED and applied as atomic SQL increments,
+    so concurrent aggregators never double-count or lose updates.
+    Returns the number of ledger rows aggregated.
+    """
+    aggregated = 0
+    while True:
+        entries = db.query(AgentMatchStat.id, AgentMatchStat.agent_id, AgentMatchStat.score).filter(
+            AgentMatchStat.is_aggregated == False
+        ).order_by(AgentMatchStat.id).limit(batch_size).with_for_update(skip_locked=True).all()
+
+        if not entries:
+            db.commit()
+            break
+
+        totals = defaultdict(lambda: [0, 0.0])
+        for _, agent_id, score in entries:
+            totals[agent_id][0] += 1
+            totals[agent_id][1] += score
+
+        # Update agents in id order so concurrent aggregators lock rows in the same order
+        for agent_id in sorted(totals):
+            match_count, score_sum = totals[agent_id]
+            new_matches = func.coalesce(Agent.total_matches, 0) + match_count
+            new_score = func.coalesce(Agent.total_score, 0.0) + score_sum
+            db.query(Agent).filter(Agent.id == agent_id).update({
+                Agent.total_matches: new_matches,
+                Agent.total_score: new_score,
+                Agent.average_score: new_score / new_matches
+            }, synchronize_session=False)
+
+        db.query(AgentMatchStat).filter(
+            AgentMatchStat.id.in_([entry_id for entry_id, _, _ in entries])
+        ).update({AgentMatchStat.is_aggregated: True}, synchronize_session=False)
+        db.commit()
+
+        aggregated += len(entries)
+        if len(entries) < batch_size:
+            break
+
+    return aggregated
+
+
+def aggregate_agent_stats_now() -> int:
+    """
+    Run one aggregation pass in its own session.
+    """
+    db = SessionLocal()
+    try:
+        return aggregate_agent_stats(db)
+    except Exception as e:
+        logger.error(f"Error aggregating agent stats: {str(e)}")
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+
+async def run_periodic_aggregation(interval: float = AGENT_STATS_AGGREGATE_INTERVAL):
+    """
+    Background loop that keeps the Agent stats columns close to the ledger.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        await loop.run_in_executor(None, aggregate_agent_stats_now)
+
+
+def summarize_agent_match(moves: bytes, response_times, errors: int = 0) -> Dict:
+    """
+    One agent's behaviour and latency summary for a finished match, computed
+    from the in-memory transcript: integer-encoded moves, and an array("f") of
+    response times in ms (NaN where the agent wasn't called). errors is the
+    number of calls that got no valid move back, timeouts included.
+    """
+    rounds = len(moves)
+    times = np.frombuffer(response_times, dtype=np.float32)
+    times = times[~np.isnan(times)]
+    first_defection = moves.find(1)
+    summary = {
+        "rounds": rounds,
+        "agent_calls": int(times.size),
+        "timeouts": int((times >= AGENT_RESPONSE_TIMEOUT * 1000).sum()),
+        "errors": errors,
+        "response_p50": None,
+        "response_p95": None,
+        "response_max": None,
+        "cooperation_rate": moves.count(0) / rounds if rounds else None,
+        "first_defection_round": first_defection if first_defection >= 0 else None
+    }
+    if times.size:
+        p50, p95 = np.percentile(times, (50, 95))
+        summary["response_p50"] = float(p50)
+        summary["response_p95"] = float(p95)
+        summary["response_max"] = float(times.max())
+    return summary
+
+
+def agent_slo_report(db: Session, since: Optional[datetime] = None,
+                     tournament_id: Optional[int] = None) -> List[Dict]:
+    """
+    Per-agent latency and reliability over its match summaries, worst first.
+    Mean percentiles are weighted by each match's agent calls.
+    Reads only the ledger, never the rounds table.
+    """
+    query = db.query(
+        AgentMatchStat.agent_id,
+        Agent.name,
+        func.count(AgentMatchStat.id),
+        func.sum(AgentMatchStat.rounds),
+        func.sum(AgentMatchStat.agent_calls),
+        func.sum(AgentMatchStat.timeouts),
+        func.sum(AgentMatchStat.errors),
+        func.sum(AgentMatchStat.response_p50 * AgentMatchStat.agent_calls),
+        func.sum(AgentMatchStat.response_p95 * AgentMatchStat.agent_calls),
+        func.max(AgentMatchStat.response_p95),
+        func.max(AgentMatchStat.response_max),
+        func.sum(AgentMatchStat.cooperation_rate * AgentMatchStat.rounds)
+    ).join(Agent, Agent.id == AgentMatchStat.agent_id).filter(
+        AgentMatchStat.rounds.isnot(None)
+    )
+    if since is not None:
+        query = query.filter(AgentMatchStat.created_at >= since)
+    if tournament_id is not None:
+        query = query.join(Match, Match.id == AgentMatchStat.match_id).filter(Match.tournament_id == tournament_id)
+
+    report = []
+    for (agent_id, name, matches, rounds, calls, timeouts, errors, weighted_p50, weighted_p95,
+         worst_p95, worst_response, cooperations) in query.group_by(AgentMatchStat.agent_id, Agent.name).all():
+        timeout_rate = timeouts / calls if calls else 0.0
+        error_rate = errors / calls if calls and errors else 0.0
+        mean_p50 = weighted_p50 / calls if calls and weighted_p50 is not None else None
+        mean_p95 = weighted_p95 / calls if calls and weighted_p95 is not None else None
+        report.append({
+            "agent_id": agent_id,
+            "name": name,
+            "matches": matches,
+            "rounds": rounds or 0,
+            "agent_calls": calls or 0,
+            "timeouts": timeouts or 0,
+            "timeout_rate": timeout_rate,
+            "errors": errors or 0,
+            "error_rate": error_rate,
+            "mean_response_p50": mean_p50,
+            "mean_response_p95": mean_p95,
+            "worst_response_p95": worst_p95,
+            "worst_response": worst_response,
+            "cooperation_rate": cooperations / rounds if rounds else None,
+            "meets_slo": (
+                timeout_rate <= AGENT_SLO_TIMEOUT_RATE
+                and error_rate <= AGENT_SLO_ERROR_RATE
+                and (mean_p95 is None or mean_p95 <= AGENT_SLO_P95_MS)
+            )
+        })
+    report.sort(key=lambda entry: (
+        entry["meets_slo"], -entry["error_rate"], -entry["timeout_rate"], -(entry["mean_response_p95"] or 0.0)
+    ))
+    return report
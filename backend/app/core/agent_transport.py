@@ -0,0 +1,259 @@
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+import httpx
+
+from app.core.rate_limit import TokenBucket
+
+# In-flight request cap for agents that don't declare one
+DEFAULT_AGENT_MAX_CONCURRENCY = int(os.getenv("DEFAULT_AGENT_MAX_CONCURRENCY", "4"))
+
+# Agents must answer within 200 ms, as per spec
+AGENT_RESPONSE_TIMEOUT = 0.2  # seconds
+
+# Connection pool shared by all agent callbacks
+MAX_AGENT_CONNECTIONS = int(os.getenv("MAX_AGENT_CONNECTIONS", "200"))
+
+# Request hedging: a duplicate request is sent once the first has been out longer
+# than the agent's AGENT_HEDGE_PERCENTILE latency. Hedges are capped at
+# AGENT_HEDGE_FRACTION of requests; 0 turns hedging off
+AGENT_HEDGE_FRACTION = float(os.getenv("AGENT_HEDGE_FRACTION", "0.05"))
+AGENT_HEDGE_PERCENTILE = float(os.getenv("AGENT_HEDGE_PERCENTILE", "95"))
+AGENT_HEDGE_MIN_SAMPLES = int(os.getenv("AGENT_HEDGE_MIN_SAMPLES", "20"))
+
+# Recent response times kept per agent
+AGENT_LATENCY_WINDOW = 256
+
+
+class AgentLimiter:
+    """
+    Per-agent in-flight cap plus optional token-bucket pacing of requests.
+    The limits can be changed in place: waiters are woken when the cap
+    grows, and a lowered cap takes effect as in-flight requests finish.
+    """
+
+    def __init__(self, max_concurrent: int, requests_per_second: Optional[float]):
+        self.max_concurrent = max_concurrent
+        self.requests_per_second = requests_per_second
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._bucket = _pacing_bucket(requests_per_second)
+        self.latencies: Deque[float] = deque(maxlen=AGENT_LATENCY_WINDOW)
+
+    def matches(self, max_concurrent: int, requests_per_second: Optional[float]) -> bool:
+        return self.max_concurrent == max_concurrent and self.requests_per_second == requests_per_second
+
+    def resize(self, max_concurrent: int, requests_per_second: Optional[float]):
+        """
+        Apply an agent's new declared limits to this limiter and its waiters.
+        """
+        if requests_per_second != self.requests_per_second:
+            self.requests_per_second = requests_per_second
+            self._bucket = _pacing_bucket(requests_per_second)
+        self.max_concurrent = max_concurrent
+        self._wake()
+
+    async def _acquire(self):
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we were cancelled: hand the slot back
+                self._release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def _release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < self.max_concurrent:
+            waiter = self._waiters.popleft()
+            if waiter.cancelled():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Wait for a free in-flight slot and, if paced, for a request token.
+        """
+        await self._acquire()
+        try:
+            while self._bucket is not None:
+                wait = self._bucket.try_acquire()
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            yield
+        finally:
+            self._release()
+
+    async def try_extra_slot(self) -> bool:
+        """
+        Take one more in-flight slot only if it is free right now.
+        Pair with release_extra_slot.
+        """
+        if self.in_flight >= self.max_concurrent or self._waiters:
+            return False
+        if self._bucket is not None and self._bucket.try_acquire() > 0:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release_extra_slot(self):
+        self._release()
+
+    def record_latency(self, seconds: float):
+        self.latencies.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Seconds to wait before hedging, or None until there are enough samples.
+        """
+        if len(self.latencies) < AGENT_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * AGENT_HEDGE_PERCENTILE / 100))]
+
+
+def _pacing_bucket(requests_per_second: Optional[float]) -> Optional[TokenBucket]:
+    return TokenBucket(requests_per_second, max(1.0, requests_per_second)) if requests_per_second else None
+
+
+class HedgeBudget:
+    """
+    Caps hedged requests at a fraction of all requests: each request earns
+    `fraction` of a hedge, banked up to `burst`.
+    """
+
+    def __init__(self, fraction: float = AGENT_HEDGE_FRACTION, burst: float = 10.0):
+        self.fraction = fraction
+        self.burst = burst
+        self.credit = 0.0
+        self.requests = 0
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+
+    def earn(self):
+        self.requests += 1
+        self.credit = min(self.burst, self.credit + self.fraction)
+
+    def can_spend(self) -> bool:
+        return self.credit >= 1.0
+
+    def spend(self):
+        self.credit -= 1.0
+        self.hedged_requests += 1
+
+
+class AgentTransport:
+    """
+    Async HTTP transport to agent callback servers, enforcing each agent's declared limits.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._limiters: Dict[int, AgentLimiter] = {}
+        self.hedge_budget = HedgeBudget()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=MAX_AGENT_CONNECTIONS, max_keepalive_connections=MAX_AGENT_CONNECTIONS)
+            )
+        return self._client
+
+    def limiter(self, agent) -> AgentLimiter:
+        max_concurrent = agent.max_concurrent_requests or DEFAULT_AGENT_MAX_CONCURRENCY
+        requests_per_second = agent.max_requests_per_second
+        limiter = self._limiters.get(agent.id)
+        if limiter is None:
+            limiter = AgentLimiter(max_concurrent, requests_per_second)
+            self._limiters[agent.id] = limiter
+        elif not limiter.matches(max_concurrent, requests_per_second):
+            # Resized in place, so requests already waiting obey the new limits too
+            limiter.resize(max_concurrent, requests_per_second)
+        return limiter
+
+    async def post(self, agent, content: bytes, headers: Dict[str, str], timeout: float) -> httpx.Response:
+        return await self.client.post(agent.callback_url, content=content, headers=headers, timeout=timeout)
+
+    async def post_hedged(self, agent, content: bytes, headers: Dict[str, str], timeout: float) -> httpx.Response:
+        """
+        POST to an agent, sending one duplicate of the request if it is still
+        outstanding at the agent's usual tail latency and the hedge budget allows.
+        The first 200 response wins; the other request is cancelled.
+        The duplicate is identical, so the agent sees the same match_id and round.
+        """
+        limiter = self.limiter(agent)
+        self.hedge_budget.earn()
+        primary = asyncio.ensure_future(self.post(agent, content, headers, timeout))
+        started = {primary: time.monotonic()}
+        pending = {primary}
+        hedge = None
+        try:
+            delay = limiter.hedge_delay()
+            if delay is not None and delay < timeout:
+                done, pending = await asyncio.wait(pending, timeout=delay)
+                if not done and self.hedge_budget.can_spend() and await limiter.try_extra_slot():
+                    self.hedge_budget.spend()
+                    hedge = asyncio.ensure_future(self.post(agent, content, headers, timeout - delay))
+                    started[hedge] = time.monotonic()
+                    pending.add(hedge)
+                pending |= done
+
+            response = None
+            error = None
+            winner = None
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Every finished attempt is sampled, failures included, so the
+                # hedge delay tracks the agent's real latency; and every one is
+                # retrieved, so no exception goes unobserved
+                for task in done:
+                    limiter.record_latency(time.monotonic() - started[task])
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    response = task.result()
+                    if response.status_code == 200 and winner is None:
+                        winner = task
+            if winner is not None:
+                if winner is hedge:
+                    self.hedge_budget.hedge_wins += 1
+                return winner.result()
+            if response is not None:
+                return response
+            raise error
+        finally:
+            # An attempt cut short took at least this long; leaving it out
+            # would let the tail estimate, and so the hedge delay, drift down
+            now = time.monotonic()
+            for task in pending:
+                limiter.record_latency(now - started[task])
+                task.cancel()
+            if hedge is not None:
+                limiter.release_extra_slot()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Create a singleton instance
+agent_transport = AgentTransport()
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import case, select
+from sqlalchemy.orm import Session
+
+from app.core.game import MOVES, DEFECT, COOPERATE
+from app.db.database import SessionLocal
+from app.db.partitions import drop_tournament_rounds
+from app.models.models import Tournament, Round, MoveType
+
+logger = logging.getLogger(__name__)
+
+# Directory holding compressed rounds segments of archived tournaments; a relative
+# setting is taken from the backend directory, not the process working directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ARCHIVE_DIR = os.path.join(BACKEND_DIR, os.getenv("ARCHIVE_DIR", "archive"))
+
+# Completed tournaments older than this are archived by the periodic job
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+
+# Seconds between runs of the periodic archival job
+ARCHIVE_INTERVAL = float(os.getenv("ARCHIVE_INTERVAL", "3600"))
+
+SEGMENT_COLUMNS = (
+    "match_id", "round_number", "agent_a_move", "agent_b_move",
+    "agent_a_score", "agent_b_score", "agent_a_response_time", "agent_b_response_time"
+)
+
+
+def segment_name(tournament_id: int) -> str:
+    return f"tournament_{int(tournament_id)}_rounds.npz"
+
+
+def segment_path(archive_path: str) -> str:
+    """
+    Absolute location of a stored segment. archive_path holds the file name
+    within ARCHIVE_DIR; absolute paths from older archives are kept as they are.
+    """
+    if os.path.isabs(archive_path):
+        return archive_path
+    return os.path.join(ARCHIVE_DIR, os.path.basename(archive_path))
+
+
+def write_segment(db: Session, tournament_id: int) -> str:
+    """
+    Dump every round of a tournament into a compressed column segment, sorted by match and round.
+    Returns the segment's name within ARCHIVE_DIR, as stored in archive_path.
+    """
+    stmt = select(
+        Round.match_id,
+        Round.round_number,
+        case((Round.agent_a_move == MoveType.DEFECT, DEFECT), else_=COOPERATE),
+        case((Round.agent_b_move == MoveType.DEFECT, DEFECT), else_=COOPERATE),
+        Round.agent_a_score,
+        Round.agent_b_score,
+        Round.agent_a_response_time,
+        Round.agent_b_response_time
+    ).where(Round.tournament_id == tournament_id)
+    rows = db.execute(stmt).all()
+
+    columns = list(zip(*rows)) if rows else [()] * len(SEGMENT_COLUMNS)
+    arrays = {
+        "match_id": np.array(columns[0], dtype=np.int64),
+        "round_number": np.array(columns[1], dtype=np.int32),
+        "agent_a_move": np.array(columns[2], dtype=np.uint8),
+        "agent_b_move": np.array(columns[3], dtype=np.uint8),
+        "agent_a_score": np.array(columns[4], dtype=np.int32),
+        "agent_b_score": np.array(columns[5], dtype=np.int32),
+        # Missing response times are stored as NaN
+        "agent_a_response_time": np.array(columns[6], dtype=np.float32),
+        "agent_b_response_time": np.array(columns[7], dtype=np.float32),
+    }
+    order = np.lexsort((arrays["round_number"], arrays["match_id"]))
+    arrays = {name: values[order] for name, values in arrays.items()}
+
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    name = segment_name(tournament_id)
+    path = segment_path(name)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+    return name
+
+
+@lru_cache(maxsize=8)
+def load_segment(archive_path: str) -> Dict[str, np.ndarray]:
+    with np.load(segment_path(archive_path)) as data:
+        return {name: data[name] for name in SEGMENT_COLUMNS}
+
+
+def archived_match_rounds(tournament: Tournament, match_id: int) -> List[Dict]:
+    """
+    Read one match's rounds back from its tournament's archive segment.
+    """
+    segment = load_segment(tournament.archive_path)
+    start, end = np.searchsorted(segment["match_id"], [match_id, match_id + 1])
+    rounds = []
+    for i in range(start, end):
+        a_time = float(segment["agent_a_response_time"][i])
+        b_time = float(segment["agent_b_response_time"][i])
+        rounds.append({
+            "round_number": int(segment["round_number"][i]),
+            "agent_a_move": MOVES[segment["agent_a_move"][i]],
+            "agent_b_move": MOVES[segment["agent_b_move"][i]],
+            "agent_a_score": int(segment["agent_a_score"][i]),
+            "agent_b_score": int(segment["agent_b_score"][i]),
+            "agent_a_response_time": None if np.isnan(a_time) else a_time,
+            "agent_b_response_time": None if np.isnan(b_time) else b_time
+        })
+    return rounds
+
+
+def archive_tournament(db: Session, tournament: Tournament) -> bool:
+    """
+    Move a completed tournament's rounds out of the hot table into a segment file.
+    The segment is written and verified before the rows are removed.
+    """
+    if tournament.archived_at is not None:
+        return False
+    if tournament.is_active or tournament.end_time is None:
+        raise ValueError("Only completed tournaments can be archived")
+
+    expected = db.query(Round).filter(Round.tournament_id == tournament.id).count()
+    path = write_segment(db, tournament.id)
+    load_segment.cache_clear()
+    if len(load_segment(path)["match_id"]) != expected:
+        os.remove(segment_path(path))
+        raise RuntimeError(f"Archive segment for tournament {tournament.id} is incomplete")
+
+    tournament.archive_path = path
+    tournament.archived_at = datetime.now()
+    drop_tournament_rounds(db, tournament.id)
+    db.commit()
+    logger.info(f"Archived {expected} rounds of tournament {tournament.id} to {segment_path(path)}")
+    return True
+
+
+def archive_cold_tournaments(older_than_days: float = ARCHIVE_AFTER_DAYS) -> int:
+    """
+    Archive every completed tournament that ended more than older_than_days ago.
+    """
+    db = SessionLocal()
+    archived = 0
+    try:
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+        tournaments = db.query(Tournament).filter(
+            Tournament.is_active == False,
+            Tournament.archived_at == None,
+            Tournament.end_time != None,
+            Tournament.end_time < cutoff
+        ).all()
+        for tournament in tournaments:
+            try:
+                if archive_tournament(db, tournament):
+                    archived += 1
+            except Exception as e:
+                logger.error(f"Error archiving tournament {tournament.id}: {str(e)}")
+                db.rollback()
+        return archived
+    finally:
+        db.close()
+
+
+async def run_periodic_archival(interval: float = ARCHIVE_INTERVAL):
+    """
+    Background loop that keeps finished tournaments out of the hot rounds table.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        await loop.run_in_executor(None, archive_cold_tournaments)
@@ -0,0 +1,62 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.core.head_to_head import HeadToHead
+
+# Population snapshots returned at most, however many generations are simulated
+MAX_SNAPSHOTS = 500
+
+
+def payoff_matrix(h2h: HeadToHead) -> np.ndarray:
+    """
+    Mean per-round payoff matrix for the replicator equation.
+    Pairs that never met (including self-play) use the row agent's mean over the opponents it did meet.
+    """
+    played = h2h.rounds > 0
+    mean = np.divide(h2h.payoff, h2h.rounds, out=np.zeros_like(h2h.payoff), where=played)
+    met = played.sum(axis=1)
+    row_mean = np.divide(mean.sum(axis=1), met, out=np.zeros(len(met)), where=met > 0)
+    return np.where(played, mean, row_mean[:, None])
+
+
+def simulate_ecology(h2h: HeadToHead, generations: int,
+                     initial_shares: Optional[Dict[int, float]] = None) -> Dict:
+    """
+    Run discrete replicator dynamics over a head-to-head payoff matrix.
+    Each generation is one matrix-vector product:
+    x' = x * (A x) / (x . A x).
+    """
+    A = payoff_matrix(h2h)
+    n = len(h2h.agent_ids)
+
+    # Fitness must be positive for the shares to stay a distribution;
+    # matrices with negative payoffs are shifted up
+    low = A.min() if n else 0.0
+    if low <= 0:
+        A = A - low + 1e-9
+
+    if initial_shares:
+        x = np.array([initial_shares.get(agent_id, 0.0) for agent_id in h2h.agent_ids], dtype=np.float64)
+        if (x < 0).any() or x.sum() <= 0:
+            raise ValueError("Initial shares must be non-negative and not all zero")
+    else:
+        x = np.ones(n)
+    x = x / x.sum()
+
+    sample_every = max(1, -(-generations // MAX_SNAPSHOTS))
+    generations_out = [0]
+    snapshots = [x]
+    for generation in range(1, generations + 1):
+        fitness = A @ x
+        x = x * fitness / (x @ fitness)
+        if generation % sample_every == 0 or generation == generations:
+            generations_out.append(generation)
+            snapshots.append(x)
+
+    return {
+        "agents": [{"id": agent_id, "name": h2h.names.get(agent_id)} for agent_id in h2h.agent_ids],
+        "generations": generations_out,
+        "shares": np.array(snapshots).round(9).tolist(),
+        "final_shares": {agent_id: float(share) for agent_id, share in zip(h2h.agent_ids, x)}
+    }
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import os
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+# Events buffered per subscriber before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("EVENT_SUBSCRIBER_QUEUE_SIZE", "256"))
+
+# Seconds between keep-alive comments on idle streams
+KEEPALIVE_INTERVAL = 15.0
+
+
+def match_topic(match_id: int):
+    return ("match", match_id)
+
+
+def tournament_topic(tournament_id: int):
+    return ("tournament", tournament_id)
+
+
+class Subscription:
+    """
+    A single subscriber's bounded event queue.
+    When the queue is full the oldest event is dropped, so a slow consumer
+    only ever loses stale progress and never blocks the publisher.
+    """
+
+    def __init__(self, topic: Hashable, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]):
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+
+class EventHub:
+    """
+    In-process publish/subscribe hub for live match and tournament events.
+    Publishing never awaits, so the match engine is never slowed down by viewers.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[Hashable, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, topic: Hashable) -> Subscription:
+        subscription = Subscription(topic)
+        self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.topic]
+
+    def has_subscribers(self, topic: Hashable) -> bool:
+        return bool(self._subscribers.get(topic))
+
+    def publish(self, topic: Hashable, event_type: str, data: Dict[str, Any]):
+        subscribers = self._subscribers.get(topic)
+        if not subscribers:
+            return
+        event = {"event": event_type, "data": data}
+        for subscription in list(subscribers):
+            subscription.offer(event)
+
+
+def format_sse(event: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """
+    Encode an event as a Server-Sent Events frame.
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event['event']}")
+    lines.append(f"data: {json.dumps(jsonable_encoder(event['data']))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def sse_response(
+    request: Request,
+    topic: Hashable,
+    terminal_events: Iterable[str] = (),
+    snapshot: Optional[Callable[[], Optional[Dict[str, Any]]]] = None
+) -> StreamingResponse:
+    """
+    Stream events for a topic to one client as text/event-stream.
+    snapshot is called once the stream is subscribed and may return an
+    initial event describing the current state, so nothing published while
+    it is being read is missed. The stream closes after a terminal event or
+    when the client disconnects.
+    """
+    terminal = set(terminal_events)
+
+    async def stream():
+        # Subscribed only once streaming starts, so a response that is never sent can't leak it
+        subscription = event_hub.subscribe(topic)
+        event_id = 0
+        reported_dropped = 0
+        try:
+            initial_event = snapshot() if snapshot is not None else None
+            if initial_event is not None:
+                yield format_sse(initial_event, event_id)
+                event_id += 1
+                if initial_event["event"] in terminal:
+                    return
+
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                # Let the client know it missed events and should resync
+                if subscription.dropped != reported_dropped:
+                    yield format_sse({"event": "dropped", "data": {"count": subscription.dropped - reported_dropped}})
+                    reported_dropped = subscription.dropped
+
+                yield format_sse(event, event_id)
+                event_id += 1
+                if event["event"] in terminal:
+                    break
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# Create a singleton instance
+event_hub = EventHub()
@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import math
+import os
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.core.agent_stats import summarize_agent_match
+from app.core.events import event_hub, match_topic, tournament_topic
+from app.core.fsm import play_machines
+from app.core.game import GameSpec, MOVES, MOVE_INDEX, DEFECT
+from app.core.head_to_head import head_to_head_cache
+from app.core.policy import policy_step
+from app.db.database import SessionLocal
+from app.models.models import Agent, AgentMatchStat, Match, Round
+from app.routers.matches import agent_fsm, play_request_encoder, resolve_move
+
+logger = logging.getLogger(__name__)
+
+# Completed matches held in memory before they are written out; 0 writes once at the end
+FAST_RUN_CHECKPOINT_MATCHES = int(os.getenv("FAST_RUN_CHECKPOINT_MATCHES", "500"))
+
+
+class MatchState:
+    """
+    A match played in memory. Moves are integer-encoded; response times are
+    in ms, NaN for rounds that didn't call the agent; errors count calls
+    that got no valid move. Rounds before first_round were already stored
+    when the run started.
+    """
+
+    __slots__ = ("match_id", "agent_a_id", "agent_b_id", "first_round",
+                 "moves_a", "moves_b", "times_a", "times_b", "errors_a", "errors_b")
+
+    def __init__(self, match_id: int, agent_a_id: int, agent_b_id: int, moves_a: bytearray, moves_b: bytearray):
+        self.match_id = match_id
+        self.agent_a_id = agent_a_id
+        self.agent_b_id = agent_b_id
+        self.first_round = len(moves_a)
+        self.moves_a = moves_a
+        self.moves_b = moves_b
+        self.times_a = array("f")
+        self.times_b = array("f")
+        self.errors_a = 0
+        self.errors_b = 0
+
+
+class FastRun:
+    """
+    In-memory execution of a tournament's matches: agents are loaded once,
+    matches are played without touching the database, and results are
+    written in one bulk transaction per checkpoint. A crash loses the
+    matches since the last checkpoint; they are still pending and rerun.
+    """
+
+    def __init__(self, db: Session, tournament_id: int, matches: Sequence[Match], round_count: int,
+                 game_spec: GameSpec, checkpoint_matches: int = FAST_RUN_CHECKPOINT_MATCHES):
+        self.tournament_id = tournament_id
+        self.round_count = round_count
+        self.game_spec = game_spec
+        self.checkpoint_matches = checkpoint_matches
+        self.completed: List[MatchState] = []
+        # Held matches that trigger the next checkpoint; pushed back after a failed write
+        self.flush_at = checkpoint_matches
+
+        agent_ids = {m.agent_a_id for m in matches} | {m.agent_b_id for m in matches}
+        self.agents: Dict[int, Agent] = {agent.id: agent for agent in db.query(Agent).filter(Agent.id.in_(agent_ids)).all()}
+        # Detached, so commits elsewhere don't expire them and trigger reloads
+        for agent in self.agents.values():
+            db.expunge(agent)
+        self.fsms = {agent_id: agent_fsm(agent) for agent_id, agent in self.agents.items()}
+
+        # Matches interrupted in an earlier run continue from their stored rounds
+        self.existing: Dict[int, tuple] = {}
+        resumed = [m.id for m in matches if m.rounds_completed]
+        if resumed:
+            rows = db.query(Round.match_id, Round.agent_a_move, Round.agent_b_move).filter(
+                Round.tournament_id == tournament_id,
+                Round.match_id.in_(resumed)
+            ).order_by(Round.match_id, Round.round_number).all()
+            for match_id, move_a, move_b in rows:
+                moves_a, moves_b = self.existing.setdefault(match_id, (bytearray(), bytearray()))
+                moves_a.append(MOVE_INDEX[move_a])
+                moves_b.append(MOVE_INDEX[move_b])
+
+    async def play(self, match: Match) -> Optional[MatchState]:
+        """
+        Play a match to completion in memory. Same game as execute_match,
+        minus per-round writes, events and transcript memoization.
+        """
+        agent_a = self.agents.get(match.agent_a_id)
+        agent_b = self.agents.get(match.agent_b_id)
+        if agent_a is None or agent_b is None:
+            return None
+        fsm_a = self.fsms[agent_a.id]
+        fsm_b = self.fsms[agent_b.id]
+        game_spec = self.game_spec
+
+        moves_a, moves_b = self.existing.pop(match.id, (bytearray(), bytearray()))
+        state = MatchState(match.id, agent_a.id, agent_b.id, moves_a, moves_b)
+
+        rng = game_spec.match_rng(match.id)
+        match_length = game_spec.match_length(rng, self.round_count)
+        for _ in range(state.first_round):
+            game_spec.apply_noise(rng, 0)
+            game_spec.apply_noise(rng, 0)
+        if state.first_round >= match_length:
+            return state
+
+        state_a = fsm_a.advance(moves_b) if fsm_a is not None else None
+        state_b = fsm_b.advance(moves_a) if fsm_b is not None else None
+        if fsm_a is not None and fsm_b is not None:
+            played_a, played_b = play_machines(
+                fsm_a, fsm_b, state_a, state_b, match_length - state.first_round, game_spec, rng
+            )
+            moves_a += played_a
+            moves_b += played_b
+            state.times_a.extend([math.nan] * len(played_a))
+            state.times_b.extend([math.nan] * len(played_b))
+            return state
+
+        request_a = play_request_encoder(agent_a, fsm_a, match.id, moves_a, moves_b)
+        request_b = play_request_encoder(agent_b, fsm_b, match.id, moves_b, moves_a)
+        policy_a = None
+        policy_b = None
+        for round_num in range(state.first_round, match_length):
+            (move_a, time_a, policy_a), (move_b, time_b, policy_b) = await asyncio.gather(
+                resolve_move(agent_a, fsm_a, state_a, policy_step(policy_a, moves_b), round_num, request_a),
+                resolve_move(agent_b, fsm_b, state_b, policy_step(policy_b, moves_a), round_num, request_b)
+            )
+            if move_a is None:
+                state.errors_a += 1
+            if move_b is None:
+                state.errors_b += 1
+            intended_a = MOVE_INDEX.get(move_a, DEFECT)
+            intended_b = MOVE_INDEX.get(move_b, DEFECT)
+            played_a = game_spec.apply_noise(rng, intended_a)
+            played_b = game_spec.apply_noise(rng, intended_b)
+            if played_a != intended_a:
+                policy_a = None
+            if played_b != intended_b:
+                policy_b = None
+            if fsm_a is not None:
+                state_a = fsm_a.transitions[state_a * 2 + played_b]
+            if fsm_b is not None:
+                state_b = fsm_b.transitions[state_b * 2 + played_a]
+
+            moves_a.append(played_a)
+            moves_b.append(played_b)
+            state.times_a.append(math.nan if time_a is None else time_a)
+            state.times_b.append(math.nan if time_b is None else time_b)
+            if request_a is not None:
+                request_a.append(played_a, played_b)
+            if request_b is not None:
+                request_b.append(played_b, played_a)
+        return state
+
+    async def add_result(self, state: Optional[MatchState]):
+        """
+        Hold a finished match, writing out a checkpoint when enough have accumulated.
+        """
+        if state is None:
+            return
+        self.completed.append(state)
+        if self.checkpoint_matches and len(self.completed) >= self.flush_at:
+            await self.flush()
+
+    async def flush(self) -> bool:
+        """
+        Write all held matches, their new rounds and ledger entries in one
+        transaction. The write runs in the default executor so matches still
+        in flight keep getting their agent calls answered on time. On failure
+        the matches are kept and retried at the next checkpoint.
+        """
+        if not self.completed:
+            return True
+        states, self.completed = self.completed, []
+        completed_at = datetime.now()
+        loop = asyncio.get_running_loop()
+        try:
+            totals, round_count = await loop.run_in_executor(None, self._write, states, completed_at)
+        except Exception as e:
+            logger.error(f"Error writing {len(states)} matches for tournament {self.tournament_id}: {str(e)}")
+            self.completed[:0] = states
+            self.flush_at = len(self.completed) + self.checkpoint_matches
+            return False
+        self.flush_at = self.checkpoint_matches
+        logger.info(f"Wrote {len(states)} matches ({round_count} rounds) for tournament {self.tournament_id}")
+
+        for state in states:
+            score_a, score_b = totals[state.match_id]
+            head_to_head_cache.record_match(
+                self.tournament_id, state.match_id, state.agent_a_id, state.agent_b_id,
+                score_a, score_b, state.moves_a, state.moves_b
+            )
+            completed_data = {
+                "match_id": state.match_id,
+                "tournament_id": self.tournament_id,
+                "agent_a_id": state.agent_a_id,
+                "agent_b_id": state.agent_b_id,
+                "agent_a_score": score_a,
+                "agent_b_score": score_b,
+                "rounds_completed": len(state.moves_a),
+                "completed_at": completed_at
+            }
+            event_hub.publish(match_topic(state.match_id), "match_completed", completed_data)
+            event_hub.publish(tournament_topic(self.tournament_id), "match_completed", completed_data)
+        return True
+
+    def _write(self, states: List[MatchState], completed_at: datetime):
+        """
+        Build the bulk mappings for finished matches and write them with a
+        session of its own. Returns each match's scores and the rounds written.
+        """
+        game_spec = self.game_spec
+        payoff_a, payoff_b = game_spec.payoff_a, game_spec.payoff_b
+
+        rounds = []
+        match_updates = []
+        stats = []
+        totals = {}
+        for state in states:
+            for i in range(state.first_round, len(state.moves_a)):
+                move_a = state.moves_a[i]
+                move_b = state.moves_b[i]
+                time_a = state.times_a[i - state.first_round]
+                time_b = state.times_b[i - state.first_round]
+                rounds.append({
+                    "tournament_id": self.tournament_id,
+                    "match_id": state.match_id,
+                    "round_number": i,
+                    "agent_a_move": MOVES[move_a],
+                    "agent_b_move": MOVES[move_b],
+                    "agent_a_score": payoff_a[move_a * 2 + move_b],
+                    "agent_b_score": payoff_b[move_a * 2 + move_b],
+                    "agent_a_response_time": None if math.isnan(time_a) else time_a,
+                    "agent_b_response_time": None if math.isnan(time_b) else time_b
+                })
+            score_a, score_b = game_spec.score_transcript(state.moves_a, state.moves_b)
+            totals[state.match_id] = (score_a, score_b)
+            match_updates.append({
+                "id": state.match_id,
+                "agent_a_score": score_a,
+                "agent_b_score": score_b,
+                "rounds_completed": len(state.moves_a),
+                "is_complete": True,
+                "completed_at": completed_at
+            })
+            stats.append({
+                "agent_id": state.agent_a_id, "match_id": state.match_id, "score": score_a,
+                **summarize_agent_match(state.moves_a, state.times_a, state.errors_a)
+            })
+            stats.append({
+                "agent_id": state.agent_b_id, "match_id": state.match_id, "score": score_b,
+                **summarize_agent_match(state.moves_b, state.times_b, state.errors_b)
+            })
+
+        db = SessionLocal()
+        try:
+            if rounds:
+                db.execute(Round.__table__.insert(), rounds)
+            db.bulk_update_mappings(Match, match_updates)
+            db.bulk_insert_mappings(AgentMatchStat, stats)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return totals, len(rounds)
@@ -0,0 +1,137 @@
+import os
+import random
+from typing import Any, Optional, Sequence, Tuple
+
+from app.core.game import GameSpec, MOVE_INDEX
+
+# Largest state machine an agent may upload
+MAX_FSM_STATES = int(os.getenv("MAX_FSM_STATES", "64"))
+
+
+class FsmError(ValueError):
+    """
+    Raised for a malformed or oversized state machine.
+    """
+
+
+class StateMachine:
+    """
+    A compiled Moore machine strategy.
+    outputs[state] is the move played in a state; the next state is
+    transitions[state * 2 + opponent_move], on the opponent's played move.
+    """
+
+    __slots__ = ("outputs", "transitions", "initial_state")
+
+    def __init__(self, outputs: bytes, transitions: bytes, initial_state: int):
+        self.outputs = outputs
+        self.transitions = transitions
+        self.initial_state = initial_state
+
+    def advance(self, opponent_moves: Sequence[int]) -> int:
+        """
+        State reached from the initial state after the given opponent moves.
+        """
+        transitions = self.transitions
+        state = self.initial_state
+        for move in opponent_moves:
+            state = transitions[state * 2 + move]
+        return state
+
+
+def compile_fsm(raw: Any) -> Optional[StateMachine]:
+    """
+    Validate and compile an uploaded state machine.
+
+    Wire format: {"initial_state": 0, "states": [{"move": "C" | "D",
+    "on_cooperate": <state>, "on_defect": <state>}, ...]}.
+    """
+    if raw is None:
+        return None
+    if not isinstance(raw, dict) or not isinstance(raw.get("states"), list):
+        raise FsmError("State machine must be an object with a list of states")
+
+    states = raw["states"]
+    if not 1 <= len(states) <= MAX_FSM_STATES:
+        raise FsmError(f"State machine must have between 1 and {MAX_FSM_STATES} states")
+
+    initial_state = raw.get("initial_state", 0)
+    outputs = bytearray(len(states))
+    transitions = bytearray(len(states) * 2)
+    for i, state in enumerate(states):
+        if not isinstance(state, dict) or not isinstance(state.get("move"), str) or state["move"] not in MOVE_INDEX:
+            raise FsmError(f"State {i} must have a move of 'C' or 'D'")
+        outputs[i] = MOVE_INDEX[state["move"]]
+        for offset, key in enumerate(("on_cooperate", "on_defect")):
+            target = state.get(key)
+            if not _is_state(target, len(states)):
+                raise FsmError(f"State {i} has an invalid {key} transition")
+            transitions[i * 2 + offset] = target
+    if not _is_state(initial_state, len(states)):
+        raise FsmError("Initial state is out of range")
+
+    return StateMachine(bytes(outputs), bytes(transitions), initial_state)
+
+
+def _is_state(value: Any, state_count: int) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value < state_count
+
+
+def play_machines(fsm_a: StateMachine, fsm_b: StateMachine, state_a: int, state_b: int,
+                  rounds: int, game_spec: GameSpec, rng: random.Random) -> Tuple[bytearray, bytearray]:
+    """
+    Play two state machines against each other for a number of rounds,
+    from the given states. Returns the integer-encoded moves.
+    """
+    if game_spec.noise_probability:
+        return _play_noisy(fsm_a, fsm_b, state_a, state_b, rounds, game_spec, rng)
+
+    # Without noise the joint state fixes the rest of the match, so the transcript
+    # is a prefix followed by a cycle of at most len(a) * len(b) rounds, repeated
+    out_a, trans_a = fsm_a.outputs, fsm_a.transitions
+    out_b, trans_b = fsm_b.outputs, fsm_b.transitions
+    width = len(out_b)
+    seen = [-1] * (len(out_a) * width)
+    moves_a = bytearray()
+    moves_b = bytearray()
+    while len(moves_a) < rounds:
+        joint = state_a * width + state_b
+        if seen[joint] >= 0:
+            start = seen[joint]
+            cycle_a, cycle_b = bytes(moves_a[start:]), bytes(moves_b[start:])
+            repeats, rest = divmod(rounds - len(moves_a), len(cycle_a))
+            moves_a += cycle_a * repeats + cycle_a[:rest]
+            moves_b += cycle_b * repeats + cycle_b[:rest]
+            break
+        seen[joint] = len(moves_a)
+        move_a = out_a[state_a]
+        move_b = out_b[state_b]
+        moves_a.append(move_a)
+        moves_b.append(move_b)
+        state_a = trans_a[state_a * 2 + move_b]
+        state_b = trans_b[state_b * 2 + move_a]
+    return moves_a, moves_b
+
+
+def _play_noisy(fsm_a: StateMachine, fsm_b: StateMachine, state_a: int, state_b: int,
+                rounds: int, game_spec: GameSpec, rng: random.Random) -> Tuple[bytearray, bytearray]:
+    # Noise is drawn in the same order as the live match loop, so results don't
+    # depend on which path played the match
+    out_a, trans_a = fsm_a.outputs, fsm_a.transitions
+    out_b, trans_b = fsm_b.outputs, fsm_b.transitions
+    noise = game_spec.noise_probability
+    draw = rng.random
+    moves_a = bytearray(rounds)
+    moves_b = bytearray(rounds)
+    for i in range(rounds):
+        move_a = out_a[state_a]
+        if draw() < noise:
+            move_a = 1 - move_a
+        move_b = out_b[state_b]
+        if draw() < noise:
+            move_b = 1 - move_b
+        moves_a[i] = move_a
+        moves_b[i] = move_b
+        state_a = trans_a[state_a * 2 + move_b]
+        state_b = trans_b[state_b * 2 + move_a]
+    return moves_a, moves_b
@@ -0,0 +1,122 @@
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.models import MoveType
+
+# Integer encoding of moves used by the scoring kernel
+COOPERATE = 0
+DEFECT = 1
+MOVES = (MoveType.COOPERATE, MoveType.DEFECT)
+MOVE_INDEX = {MoveType.COOPERATE: COOPERATE, MoveType.DEFECT: DEFECT}
+
+# Standard Prisoner's Dilemma payoffs, keyed by "<a move><b move>"
+DEFAULT_PAYOFF_MATRIX = {
+    "CC": [3, 3],
+    "CD": [0, 5],
+    "DC": [5, 0],
+    "DD": [1, 1],
+}
+
+OUTCOME_KEYS = ("CC", "CD", "DC", "DD")
+
+
+class GameSpec:
+    """
+    A tournament's game, compiled for the match hot loop.
+    Payoffs are held in flat tables indexed by a_move * 2 + b_move.
+    """
+
+    __slots__ = ("payoff_a", "payoff_b", "payoff_a_array", "payoff_b_array",
+                 "noise_probability", "continuation_probability")
+
+    def __init__(
+        self,
+        payoff_matrix: Optional[Dict[str, Sequence[int]]] = None,
+        noise_probability: float = 0.0,
+        continuation_probability: Optional[float] = None
+    ):
+        payoff_matrix = payoff_matrix or DEFAULT_PAYOFF_MATRIX
+        missing = [key for key in OUTCOME_KEYS if key not in payoff_matrix]
+        if missing or len(payoff_matrix) != len(OUTCOME_KEYS):
+            raise ValueError(f"Payoff matrix must have exactly the keys {', '.join(OUTCOME_KEYS)}")
+        for key in OUTCOME_KEYS:
+            payoffs = payoff_matrix[key]
+            if len(payoffs) != 2 or not all(isinstance(p, int) for p in payoffs):
+                raise ValueError(f"Payoff for {key} must be a pair of integers")
+        if not 0.0 <= (noise_probability or 0.0) <= 0.5:
+            raise ValueError("Noise probability must be between 0 and 0.5")
+        if continuation_probability is not None and not 0.0 < continuation_probability < 1.0:
+            raise ValueError("Continuation probability must be between 0 and 1 (exclusive)")
+
+        self.payoff_a = tuple(payoff_matrix[key][0] for key in OUTCOME_KEYS)
+        self.payoff_b = tuple(payoff_matrix[key][1] for key in OUTCOME_KEYS)
+        self.payoff_a_array = np.array(self.payoff_a, dtype=np.int64)
+        self.payoff_b_array = np.array(self.payoff_b, dtype=np.int64)
+        self.noise_probability = noise_probability or 0.0
+        self.continuation_probability = continuation_probability
+
+    def score(self, move_a: int, move_b: int) -> Tuple[int, int]:
+        """
+        Score a single round of integer-encoded moves.
+        """
+        index = move_a * 2 + move_b
+        return self.payoff_a[index], self.payoff_b[index]
+
+    def score_transcript(self, moves_a: Sequence[int], moves_b: Sequence[int]) -> Tuple[int, int]:
+        """
+        Score a whole transcript of integer-encoded moves in one vectorized pass.
+        """
+        a = np.frombuffer(bytes(moves_a), dtype=np.uint8)
+        b = np.frombuffer(bytes(moves_b), dtype=np.uint8)
+        outcomes = a.astype(np.intp) * 2 + b
+        return int(self.payoff_a_array[outcomes].sum()), int(self.payoff_b_array[outcomes].sum())
+
+    def match_rng(self, match_id: int) -> random.Random:
+        """
+        Deterministic per-match random stream, so resumed matches replay the same noise and length.
+        """
+        return random.Random(match_id)
+
+    def match_length(self, rng: random.Random, round_count: int) -> int:
+        """
+        Number of rounds to play: fixed, or geometric with round_count as the cap.
+        """
+        if self.continuation_probability is None:
+            return round_count
+        rounds = 1
+        while rounds < round_count and rng.random() < self.continuation_probability:
+            rounds += 1
+        return rounds
+
+    def apply_noise(self, rng: random.Random, move: int) -> int:
+        """
+        Flip a move with the spec's noise probability.
+        """
+        if self.noise_probability and rng.random() < self.noise_probability:
+            return 1 - move
+        return move
+
+    def to_payoff_matrix(self) -> Dict[str, List[int]]:
+        return {key: [self.payoff_a[i], self.payoff_b[i]] for i, key in enumerate(OUTCOME_KEYS)}
+
+
+DEFAULT_GAME_SPEC = GameSpec()
+
+
+def compile_game_spec(tournament) -> GameSpec:
+    """
+    Compile a tournament's game settings into a GameSpec.
+    Raises ValueError if the settings are invalid.
+    """
+    if tournament is None:
+        return DEFAULT_GAME_SPEC
+    if (tournament.payoff_matrix is None and not tournament.noise_probability
+            and tournament.continuation_probability is None):
+        return DEFAULT_GAME_SPEC
+    return GameSpec(
+        payoff_matrix=tournament.payoff_matrix,
+        noise_probability=tournament.noise_probability,
+        continuation_probability=tournament.continuation_probability
+    )
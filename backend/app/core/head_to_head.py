@@ -0,0 +1,221 @@
+import json
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from app.core.archive import load_segment
+from app.core.game import COOPERATE
+from app.models.models import Agent, Match, Round, Tournament, MoveType
+
+# Tournaments whose head-to-head matrices are kept in memory
+H2H_CACHE_MAX_TOURNAMENTS = int(os.getenv("H2H_CACHE_MAX_TOURNAMENTS", "16"))
+
+
+class HeadToHead:
+    """
+    Per-tournament N x N accumulators: row agent's total payoff, cooperations
+    and rounds played against the column agent, over completed matches.
+    match_ids holds the matches already counted, so none is added twice.
+    """
+
+    def __init__(self, agent_ids: Sequence[int], names: Dict[int, str], frozen: bool):
+        self.agent_ids = list(agent_ids)
+        self.names = names
+        self.index = {agent_id: i for i, agent_id in enumerate(self.agent_ids)}
+        n = len(self.agent_ids)
+        self.payoff = np.zeros((n, n))
+        self.cooperations = np.zeros((n, n))
+        self.rounds = np.zeros((n, n))
+        self.frozen = frozen
+        self.match_ids = set()
+        self.version = 0
+        self._body: Optional[bytes] = None
+
+    def add(self, agent_a_id: int, agent_b_id: int, payoff_a: float, payoff_b: float,
+            cooperations_a: float, cooperations_b: float, rounds: float):
+        a, b = self.index[agent_a_id], self.index[agent_b_id]
+        self.payoff[a, b] += payoff_a
+        self.payoff[b, a] += payoff_b
+        self.cooperations[a, b] += cooperations_a
+        self.cooperations[b, a] += cooperations_b
+        self.rounds[a, b] += rounds
+        self.rounds[b, a] += rounds
+        self.version += 1
+        self._body = None
+
+    def body(self, tournament_id: int) -> bytes:
+        """
+        Serialized response, rebuilt only after the matrices change. Matches
+        are added from the event loop while this runs in the threadpool, so a
+        body that raced with an update is returned but not kept.
+        """
+        body = self._body
+        if body is None:
+            version = self.version
+            played = self.rounds > 0
+            mean_payoff = np.divide(self.payoff, self.rounds, out=np.zeros_like(self.payoff), where=played)
+            cooperation_rate = np.divide(self.cooperations, self.rounds, out=np.zeros_like(self.payoff), where=played)
+            body = json.dumps({
+                "tournament_id": tournament_id,
+                "frozen": self.frozen,
+                "agents": [{"id": agent_id, "name": self.names.get(agent_id)} for agent_id in self.agent_ids],
+                "mean_payoff": _to_nested(mean_payoff, played),
+                "cooperation_rate": _to_nested(cooperation_rate, played),
+                "rounds": self.rounds.astype(np.int64).tolist()
+            }).encode("utf-8")
+            if self.version == version:
+                self._body = body
+        return body
+
+
+def _to_nested(values: np.ndarray, played: np.ndarray):
+    # Pairs that never met are null rather than 0
+    return [
+        [value if has_played else None for value, has_played in zip(row, played_row)]
+        for row, played_row in zip(values.round(6).tolist(), played.tolist())
+    ]
+
+
+def _build(db: Session, tournament: Tournament) -> HeadToHead:
+    if tournament.archive_path is not None:
+        matches = db.query(Match.id, Match.agent_a_id, Match.agent_b_id).filter(
+            Match.tournament_id == tournament.id,
+            Match.is_complete == True
+        ).order_by(Match.id).all()
+        h2h = _new_head_to_head(db, tournament, matches)
+        _add_from_segment(h2h, tournament, matches)
+        return h2h
+
+    # One grouped query per completed match, so the matches counted and their
+    # totals come from the same snapshot
+    cooperate_a = case((Round.agent_a_move == MoveType.COOPERATE, 1), else_=0)
+    cooperate_b = case((Round.agent_b_move == MoveType.COOPERATE, 1), else_=0)
+    rows = db.query(
+        Match.id,
+        Match.agent_a_id,
+        Match.agent_b_id,
+        func.sum(Round.agent_a_score),
+        func.sum(Round.agent_b_score),
+        func.sum(cooperate_a),
+        func.sum(cooperate_b),
+        func.count(Round.id)
+    ).outerjoin(Round, and_(Round.match_id == Match.id, Round.tournament_id == tournament.id)).filter(
+        Match.tournament_id == tournament.id,
+        Match.is_complete == True
+    ).group_by(Match.id, Match.agent_a_id, Match.agent_b_id).all()
+
+    h2h = _new_head_to_head(db, tournament, rows)
+    for _, agent_a_id, agent_b_id, payoff_a, payoff_b, coop_a, coop_b, count in rows:
+        h2h.add(agent_a_id, agent_b_id, payoff_a or 0, payoff_b or 0, coop_a or 0, coop_b or 0, count)
+    return h2h
+
+
+def _new_head_to_head(db: Session, tournament: Tournament, matches) -> HeadToHead:
+    # Rows start with (match id, agent a id, agent b id)
+    agent_ids = sorted({m[1] for m in matches} | {m[2] for m in matches})
+    names = dict(db.query(Agent.id, Agent.name).filter(Agent.id.in_(agent_ids)).all()) if agent_ids else {}
+    h2h = HeadToHead(agent_ids, names, frozen=tournament.end_time is not None)
+    h2h.match_ids.update(m[0] for m in matches)
+    return h2h
+
+
+def _add_from_segment(h2h: HeadToHead, tournament: Tournament, matches):
+    segment = load_segment(tournament.archive_path)
+    match_ids = np.array([m.id for m in matches], dtype=np.int64)
+    pair_a = np.array([h2h.index[m.agent_a_id] for m in matches], dtype=np.intp)
+    pair_b = np.array([h2h.index[m.agent_b_id] for m in matches], dtype=np.intp)
+    if len(match_ids) == 0:
+        return
+
+    match_index = np.searchsorted(match_ids, segment["match_id"])
+    in_range = match_index < len(match_ids)
+    known = np.zeros(len(match_index), dtype=bool)
+    known[in_range] = match_ids[match_index[in_range]] == segment["match_id"][in_range]
+    match_index = match_index[known]
+    a, b = pair_a[match_index], pair_b[match_index]
+
+    np.add.at(h2h.payoff, (a, b), segment["agent_a_score"][known])
+    np.add.at(h2h.payoff, (b, a), segment["agent_b_score"][known])
+    np.add.at(h2h.cooperations, (a, b), segment["agent_a_move"][known] == COOPERATE)
+    np.add.at(h2h.cooperations, (b, a), segment["agent_b_move"][known] == COOPERATE)
+    np.add.at(h2h.rounds, (a, b), 1)
+    np.add.at(h2h.rounds, (b, a), 1)
+
+
+class HeadToHeadCache:
+    """
+    LRU cache of per-tournament head-to-head matrices.
+    Running tournaments are updated in place as matches complete;
+    completed tournaments are frozen.
+    """
+
+    def __init__(self, max_tournaments: int = H2H_CACHE_MAX_TOURNAMENTS):
+        self.max_tournaments = max_tournaments
+        self._entries: "OrderedDict[int, HeadToHead]" = OrderedDict()
+        # Matches recorded per tournament, so a build that raced with one isn't cached
+        self._recorded: Dict[int, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, tournament: Tournament) -> HeadToHead:
+        """
+        Cached matrices for a tournament, built from the database on a miss.
+        Blocking; the build runs outside the lock so recording matches never waits on it.
+        """
+        with self._lock:
+            h2h = self._entries.get(tournament.id)
+            if h2h is not None:
+                # Freeze once the tournament has completed
+                if not h2h.frozen and tournament.end_time is not None:
+                    h2h.frozen = True
+                    h2h._body = None
+                self._entries.move_to_end(tournament.id)
+                return h2h
+            recorded = self._recorded[tournament.id]
+
+        h2h = _build(db, tournament)
+
+        with self._lock:
+            cached = self._entries.get(tournament.id)
+            if cached is not None:
+                return cached
+            # A match recorded during the build may be missing from it; serve it uncached
+            if self._recorded[tournament.id] != recorded:
+                return h2h
+            self._entries[tournament.id] = h2h
+            while len(self._entries) > self.max_tournaments:
+                evicted, _ = self._entries.popitem(last=False)
+                self._recorded.pop(evicted, None)
+            return h2h
+
+    def record_match(self, tournament_id: int, match_id: int, agent_a_id: int, agent_b_id: int,
+                     payoff_a: float, payoff_b: float, moves_a: Sequence[int], moves_b: Sequence[int]):
+        """
+        Fold a just-completed match into a cached, still-running tournament.
+        Matches are recorded after their commit, so a build in between may
+        already have counted it; those are skipped.
+        """
+        with self._lock:
+            self._recorded[tournament_id] += 1
+            h2h = self._entries.get(tournament_id)
+            if h2h is None or h2h.frozen:
+                return
+            if agent_a_id not in h2h.index or agent_b_id not in h2h.index:
+                # A new participant changes the matrix shape; rebuild on next read
+                del self._entries[tournament_id]
+                return
+            if match_id in h2h.match_ids:
+                return
+            h2h.match_ids.add(match_id)
+            h2h.add(
+                agent_a_id, agent_b_id, payoff_a, payoff_b,
+                len(moves_a) - sum(moves_a), len(moves_b) - sum(moves_b), len(moves_a)
+            )
+
+
+# Create a singleton instance
+head_to_head_cache = HeadToHeadCache()
@@ -0,0 +1,91 @@
+import asyncio
+import os
+
+from fastapi import HTTPException, status
+
+# How often the event loop is sampled
+LOOP_LAG_SAMPLE_INTERVAL = float(os.getenv("LOOP_LAG_SAMPLE_INTERVAL", "0.1"))
+
+# Smoothed lag above which the process counts as overloaded; it recovers below half of this
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100"))
+
+# Retry-After sent with shed requests
+LOOP_LAG_RETRY_AFTER = int(os.getenv("LOOP_LAG_RETRY_AFTER", "2"))
+
+# Weight of the newest sample in the smoothed lag
+LOOP_LAG_SMOOTHING = 0.2
+
+
+class LoopLagMonitor:
+    """
+    Event loop lag sampler: a timer is scheduled every interval and lag is how
+    late it fires. The smoothed lag drives admission control, with hysteresis
+    so the process doesn't flap in and out of overload.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_SAMPLE_INTERVAL, threshold_ms: float = LOOP_LAG_THRESHOLD_MS):
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.lag_ms = 0.0
+        self.smoothed_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = 0
+        self.overloaded = False
+        self.shed_requests = 0
+
+    def record(self, lag_ms: float):
+        self.lag_ms = lag_ms
+        self.max_ms = max(self.max_ms, lag_ms)
+        if self.samples:
+            self.smoothed_ms += LOOP_LAG_SMOOTHING * (lag_ms - self.smoothed_ms)
+        else:
+            self.smoothed_ms = lag_ms
+        self.samples += 1
+        if self.smoothed_ms > self.threshold_ms:
+            self.overloaded = True
+        elif self.smoothed_ms < self.threshold_ms / 2:
+            self.overloaded = False
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, (loop.time() - due) * 1000))
+
+    def match_window(self, requested: int) -> int:
+        """
+        In-flight match window a tournament may use right now: the requested
+        size normally; under overload at most half of it, shrinking further
+        the more lag exceeds the threshold.
+        """
+        if not self.overloaded:
+            return requested
+        scaled = int(requested * self.threshold_ms / max(self.smoothed_ms, self.threshold_ms))
+        return max(1, min(requested // 2, scaled))
+
+    def metrics(self):
+        return {
+            "event_loop_lag_ms": round(self.lag_ms, 3),
+            "event_loop_lag_smoothed_ms": round(self.smoothed_ms, 3),
+            "event_loop_lag_max_ms": round(self.max_ms, 3),
+            "event_loop_overloaded": self.overloaded,
+            "shed_requests": self.shed_requests
+        }
+
+
+# Create a singleton instance
+loop_monitor = LoopLagMonitor()
+
+
+async def shed_when_overloaded():
+    """
+    Dependency for non-critical endpoints: refuse with 503 while the event loop is overloaded.
+    """
+    if loop_monitor.overloaded:
+        loop_monitor.shed_requests += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy running tournaments, try again shortly",
+            headers={"Retry-After": str(LOOP_LAG_RETRY_AFTER)}
+        )
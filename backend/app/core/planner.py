@@ -0,0 +1,122 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.agent_transport import DEFAULT_AGENT_MAX_CONCURRENCY
+from app.core.game import compile_game_spec
+from app.core.scheduler import fair_scheduler
+from app.core.tournament_engine import matchmaking_pairings
+from app.db.database import DATABASE_POOL_SIZE, DATABASE_MAX_OVERFLOW
+from app.models.models import Agent, AgentMatchStat, Tournament
+
+# Response time assumed for agents with no recorded history: the full 200 ms timeout
+DEFAULT_RESPONSE_TIME_MS = 200.0
+
+# Only this much recent history is used, to keep the estimate cheap and current
+PLANNER_HISTORY_DAYS = 7
+
+# Engine-side cost per round: building requests, scoring and the per-round commit
+ROUND_OVERHEAD_MS = 2.0
+
+# Approximate on-disk size of one stored round, including index entries
+ROUND_ROW_BYTES = 120
+
+# Connections left free for API requests when sizing the match window
+API_POOL_HEADROOM = 2
+
+
+def agent_response_times(db: Session, agent_ids: Iterable[int]) -> Dict[int, float]:
+    """
+    Typical response time (ms) per agent over the recent history window:
+    the per-match medians from the stats ledger, weighted by agent calls.
+    """
+    since = datetime.now() - timedelta(days=PLANNER_HISTORY_DAYS)
+    rows = db.query(
+        AgentMatchStat.agent_id,
+        func.sum(AgentMatchStat.response_p50 * AgentMatchStat.agent_calls),
+        func.sum(AgentMatchStat.agent_calls)
+    ).filter(
+        AgentMatchStat.agent_id.in_(list(agent_ids)),
+        AgentMatchStat.created_at >= since,
+        AgentMatchStat.response_p50.isnot(None)
+    ).group_by(AgentMatchStat.agent_id).all()
+    return {agent_id: weighted / calls for agent_id, weighted, calls in rows if calls}
+
+
+def expected_rounds(round_count: int, continuation_probability) -> float:
+    """
+    Expected match length: fixed, or the mean of a geometric length capped at round_count.
+    """
+    if continuation_probability is None:
+        return float(round_count)
+    w = continuation_probability
+    return (1 - w ** round_count) / (1 - w)
+
+
+def database_pool_capacity() -> int:
+    return DATABASE_POOL_SIZE + max(DATABASE_MAX_OVERFLOW, 0)
+
+
+def plan_tournament(db: Session, tournament: Tournament, agents: List[Agent],
+                    matchmaking_type: str, concurrent_matches: int) -> Dict:
+    """
+    Estimate the size, wall time and DB write volume of running a tournament,
+    without creating any matches.
+    Raises ValueError for an unknown matchmaking type.
+    """
+    pairs = matchmaking_pairings(agents, matchmaking_type)
+    match_count = len(pairs)
+
+    game_spec = compile_game_spec(tournament)
+    rounds_per_match = expected_rounds(tournament.round_count, game_spec.continuation_probability)
+
+    latencies = agent_response_times(db, [agent.id for agent in agents])
+    caps = {agent.id: agent.max_concurrent_requests or DEFAULT_AGENT_MAX_CONCURRENCY for agent in agents}
+
+    # Both moves of a round are requested together, so a round waits for the slower agent
+    agent_busy_ms = defaultdict(float)
+    total_match_ms = 0.0
+    for agent_a, agent_b in pairs:
+        round_ms = max(
+            latencies.get(agent_a.id, DEFAULT_RESPONSE_TIME_MS),
+            latencies.get(agent_b.id, DEFAULT_RESPONSE_TIME_MS)
+        ) + ROUND_OVERHEAD_MS
+        match_ms = round_ms * rounds_per_match
+        total_match_ms += match_ms
+        agent_busy_ms[agent_a.id] += match_ms
+        agent_busy_ms[agent_b.id] += match_ms
+
+    # Wall time is bounded by the match window and by the busiest agent's own cap
+    window_bound_ms = total_match_ms / max(min(concurrent_matches, fair_scheduler.capacity), 1)
+    agent_bound_ms = max(
+        (busy / caps[agent_id] for agent_id, busy in agent_busy_ms.items()),
+        default=0.0
+    )
+    estimated_ms = max(window_bound_ms, agent_bound_ms)
+
+    # Each running match holds one DB connection; agents cap how many can usefully run,
+    # and the engine-wide scheduler never grants more slots than its capacity
+    pool_limit = max(database_pool_capacity() - API_POOL_HEADROOM, 1)
+    agent_limit = max(sum(caps.values()) // 2, 1)
+    recommended = max(min(pool_limit, agent_limit, fair_scheduler.capacity, match_count), 1)
+
+    total_rounds = match_count * rounds_per_match
+    return {
+        "tournament_id": tournament.id,
+        "matchmaking_type": matchmaking_type,
+        "agent_count": len(agents),
+        "match_count": match_count,
+        "expected_rounds_per_match": rounds_per_match,
+        "concurrent_matches": concurrent_matches,
+        "estimated_seconds": estimated_ms / 1000,
+        "estimated_seconds_at_recommended": max(total_match_ms / recommended, agent_bound_ms) / 1000,
+        "recommended_concurrent_matches": recommended,
+        "agents_without_history": sum(1 for agent in agents if agent.id not in latencies),
+        "db_rows_written": int(math.ceil(total_rounds)) + 3 * match_count,
+        "db_commits": int(math.ceil(total_rounds)) + match_count,
+        "db_bytes_written": int(math.ceil(total_rounds * ROUND_ROW_BYTES))
+    }
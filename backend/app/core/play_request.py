@@ -0,0 +1,42 @@
+import json
+from typing import Optional
+
+from app.core.game import MOVES
+
+# Encoded history elements, indexed by own_move * 2 + opponent_move
+HISTORY_ITEMS = tuple(
+    json.dumps({"self": MOVES[own], "opponent": MOVES[other]}).encode("utf-8")
+    for own in (0, 1)
+    for other in (0, 1)
+)
+
+
+class PlayRequestEncoder:
+    """
+    One agent's v1 play request body for a match, built incrementally.
+    The history is held pre-encoded and each round appends a single element,
+    so a request costs one copy rather than re-encoding the whole history.
+    The bytes are the same as json.dumps of the equivalent PlayRequest dict.
+    """
+
+    __slots__ = ("idempotency_prefix", "head", "history", "tail")
+
+    def __init__(self, match_id: int, lookahead: Optional[int] = None):
+        self.idempotency_prefix = f"{match_id}:"
+        self.head = b'{"match_id": ' + json.dumps(str(match_id)).encode("utf-8") + b', "round": '
+        self.history = bytearray()
+        if lookahead:
+            self.tail = b'], "lookahead": ' + str(lookahead).encode("ascii") + b"}"
+        else:
+            self.tail = b"]}"
+
+    def append(self, own_move: int, opponent_move: int):
+        if self.history:
+            self.history += b", "
+        self.history += HISTORY_ITEMS[own_move * 2 + opponent_move]
+
+    def body(self, round_num: int) -> bytes:
+        return b"".join((self.head, str(round_num).encode("ascii"), b', "history": [', self.history, self.tail))
+
+    def idempotency_key(self, round_num: int) -> str:
+        return f"{self.idempotency_prefix}{round_num}"
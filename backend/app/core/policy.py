@@ -0,0 +1,63 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from app.core.game import MOVE_INDEX
+
+# Hard limits on the conditional policies agents may return
+MAX_POLICY_DEPTH = 16
+MAX_POLICY_NODES = 1024
+
+# A policy maps the opponent's move in the previous round to
+# (own move this round, policy for the round after)
+Policy = Dict[int, Tuple[int, Optional["Policy"]]]
+
+
+class PolicyError(ValueError):
+    """
+    Raised for a malformed or oversized policy.
+    """
+
+
+def parse_policy(raw: Any, max_depth: int) -> Optional[Policy]:
+    """
+    Validate a policy from an agent response.
+
+    Wire format: {"C": node, "D": node}, keyed on the opponent's move in the
+    round just requested; a node is {"move": "C" | "D", "C": node, "D": node}
+    with the nested keys optional. A missing branch means "ask me again".
+    Depth is capped at MAX_POLICY_DEPTH whatever the agent declared.
+    """
+    max_depth = min(max_depth, MAX_POLICY_DEPTH)
+    if raw is None or max_depth <= 0:
+        return None
+    nodes = [0]
+
+    def parse_branches(branches: Any, depth: int) -> Optional[Policy]:
+        if branches is None or depth > max_depth:
+            return None
+        if not isinstance(branches, dict):
+            raise PolicyError("Policy branches must be an object")
+        policy = {}
+        for key in ("C", "D"):
+            node = branches.get(key)
+            if node is None:
+                continue
+            if not isinstance(node, dict) or not isinstance(node.get("move"), str) or node["move"] not in MOVE_INDEX:
+                raise PolicyError("Policy node must have a move of 'C' or 'D'")
+            nodes[0] += 1
+            if nodes[0] > MAX_POLICY_NODES:
+                raise PolicyError("Policy is too large")
+            children = {k: node[k] for k in ("C", "D") if k in node}
+            policy[MOVE_INDEX[key]] = (MOVE_INDEX[node["move"]], parse_branches(children or None, depth + 1))
+        return policy or None
+
+    return parse_branches(raw, 1)
+
+
+def policy_step(policy: Optional[Policy], opponent_moves: Sequence[int]) -> Optional[Tuple[int, Optional[Policy]]]:
+    """
+    Resolve this round's move from a pending policy, given the opponent's moves so far.
+    Returns (move, remaining policy), or None if the agent has to be called.
+    """
+    if not policy or not opponent_moves:
+        return None
+    return policy.get(opponent_moves[-1])
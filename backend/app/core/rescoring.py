@@ -0,0 +1,142 @@
+import argparse
+import json
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import case, select
+from sqlalchemy.orm import Session
+
+from app.core.archive import load_segment
+from app.core.game import GameSpec, DEFECT, COOPERATE
+from app.models.models import Agent, Match, Round, Tournament, MoveType
+
+# Rows pulled from the database per fetch when streaming transcripts
+FETCH_CHUNK_SIZE = 100000
+
+
+def load_tournament_transcripts(db: Session, tournament_id: int):
+    """
+    Bulk-load every stored move of a tournament as integer-encoded NumPy arrays.
+    Returns (match_ids, moves_a, moves_b), one entry per round.
+    Archived tournaments are read from their segment file.
+    """
+    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    if tournament is not None and tournament.archive_path is not None:
+        segment = load_segment(tournament.archive_path)
+        return segment["match_id"], segment["agent_a_move"], segment["agent_b_move"]
+
+    stmt = select(
+        Round.match_id,
+        case((Round.agent_a_move == MoveType.DEFECT, DEFECT), else_=COOPERATE),
+        case((Round.agent_b_move == MoveType.DEFECT, DEFECT), else_=COOPERATE)
+    ).where(Round.tournament_id == tournament_id)
+
+    match_chunks, a_chunks, b_chunks = [], [], []
+    result = db.execute(stmt.execution_options(yield_per=FETCH_CHUNK_SIZE))
+    for partition in result.partitions(FETCH_CHUNK_SIZE):
+        chunk = np.array(partition, dtype=np.int64).reshape(-1, 3)
+        match_chunks.append(chunk[:, 0])
+        a_chunks.append(chunk[:, 1].astype(np.uint8))
+        b_chunks.append(chunk[:, 2].astype(np.uint8))
+
+    if not match_chunks:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8), np.empty(0, dtype=np.uint8)
+    return np.concatenate(match_chunks), np.concatenate(a_chunks), np.concatenate(b_chunks)
+
+
+def rescore_tournament(db: Session, tournament_id: int, game_spec: GameSpec, include_matches: bool = True) -> Dict:
+    """
+    Recompute per-match scores and standings for a tournament under another payoff matrix.
+    Works entirely from stored transcripts in one vectorized pass; no agent is called
+    and nothing in the database is modified. Without include_matches only the
+    standings are returned and "matches" is None.
+    """
+    match_rows = db.query(Match.id, Match.agent_a_id, Match.agent_b_id).filter(
+        Match.tournament_id == tournament_id,
+        Match.is_complete == True
+    ).order_by(Match.id).all()
+
+    match_ids = np.array([row[0] for row in match_rows], dtype=np.int64)
+    agent_a_ids = np.array([row[1] for row in match_rows], dtype=np.int64)
+    agent_b_ids = np.array([row[2] for row in match_rows], dtype=np.int64)
+
+    round_match_ids, moves_a, moves_b = load_tournament_transcripts(db, tournament_id)
+
+    # Only rounds of completed matches take part
+    match_index = np.searchsorted(match_ids, round_match_ids)
+    in_range = match_index < len(match_ids)
+    known = np.zeros(len(round_match_ids), dtype=bool)
+    known[in_range] = match_ids[match_index[in_range]] == round_match_ids[in_range]
+    match_index = match_index[known]
+
+    outcomes = moves_a[known].astype(np.intp) * 2 + moves_b[known]
+    scores_a = np.bincount(match_index, weights=game_spec.payoff_a_array[outcomes], minlength=len(match_ids))
+    scores_b = np.bincount(match_index, weights=game_spec.payoff_b_array[outcomes], minlength=len(match_ids))
+
+    # Standings: total and average match score per agent
+    agent_ids, agent_index = np.unique(np.concatenate([agent_a_ids, agent_b_ids]), return_inverse=True)
+    all_scores = np.concatenate([scores_a, scores_b])
+    totals = np.bincount(agent_index, weights=all_scores, minlength=len(agent_ids))
+    counts = np.bincount(agent_index, minlength=len(agent_ids))
+    averages = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+
+    names = dict(db.query(Agent.id, Agent.name).filter(Agent.id.in_(agent_ids.tolist())).all())
+    order = np.argsort(-averages, kind="stable")
+    standings = [
+        {
+            "rank": rank + 1,
+            "agent_id": int(agent_ids[i]),
+            "name": names.get(int(agent_ids[i])),
+            "matches": int(counts[i]),
+            "total_score": float(totals[i]),
+            "average_score": float(averages[i])
+        }
+        for rank, i in enumerate(order)
+    ]
+
+    matches = None
+    if include_matches:
+        matches = [
+            {
+                "match_id": int(match_ids[i]),
+                "agent_a_id": int(agent_a_ids[i]),
+                "agent_b_id": int(agent_b_ids[i]),
+                "agent_a_score": float(scores_a[i]),
+                "agent_b_score": float(scores_b[i])
+            }
+            for i in range(len(match_ids))
+        ]
+
+    return {
+        "tournament_id": tournament_id,
+        "payoff_matrix": game_spec.to_payoff_matrix(),
+        "rounds_scored": int(len(outcomes)),
+        "matches": matches,
+        "standings": standings
+    }
+
+
+def _parse_payoff(values: List[str]) -> Dict[str, List[int]]:
+    payoff_matrix = {}
+    for value in values:
+        key, _, payoffs = value.partition("=")
+        payoff_matrix[key.upper()] = [int(p) for p in payoffs.split(",")]
+    return payoff_matrix
+
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Re-score a tournament under an alternative payoff matrix")
+    parser.add_argument("tournament_id", type=int)
+    parser.add_argument("payoffs", nargs=4, metavar="OUTCOME=A,B", help="e.g. CC=3,3 CD=0,5 DC=5,0 DD=1,1")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = rescore_tournament(
+            db, args.tournament_id, GameSpec(payoff_matrix=_parse_payoff(args.payoffs)), include_matches=False
+        )
+        print(json.dumps({key: result[key] for key in ("tournament_id", "payoff_matrix", "rounds_scored", "standings")}, indent=2))
+    finally:
+        db.close()
@@ -0,0 +1,94 @@
+import asyncio
+import os
+from collections import defaultdict, deque
+from typing import Deque, Dict
+
+# Matches allowed to run at once across all tournaments in this process
+ENGINE_MAX_CONCURRENT_MATCHES = int(os.getenv("ENGINE_MAX_CONCURRENT_MATCHES", "20"))
+
+
+class FairShareScheduler:
+    """
+    Engine-wide match slot budget shared by all running tournaments.
+    Free slots go to waiting tournaments by weighted fair queuing: each grant
+    advances the tournament's virtual time by 1 / weight, and the waiting
+    tournament with the lowest virtual time is served next.
+    """
+
+    def __init__(self, capacity: int = ENGINE_MAX_CONCURRENT_MATCHES):
+        self.capacity = capacity
+        self.in_use = 0
+        self._weights: Dict[int, float] = {}
+        self._virtual_time: Dict[int, float] = {}
+        self._waiters: Dict[int, Deque[asyncio.Future]] = {}
+        self._in_use_by: Dict[int, int] = defaultdict(int)
+
+    def register(self, tournament_id: int, weight: float = 1.0):
+        if weight <= 0:
+            raise ValueError("Tournament weight must be positive")
+        # Join at the current virtual clock so a newcomer neither starves nor gets a burst
+        clock = min(self._virtual_time.values(), default=0.0)
+        self._weights[tournament_id] = weight
+        self._virtual_time[tournament_id] = clock
+        self._waiters[tournament_id] = deque()
+
+    def unregister(self, tournament_id: int):
+        for waiter in self._waiters.pop(tournament_id, ()):
+            waiter.cancel()
+        self._weights.pop(tournament_id, None)
+        self._virtual_time.pop(tournament_id, None)
+        self._in_use_by.pop(tournament_id, None)
+
+    def active_matches(self, tournament_id: int) -> int:
+        return self._in_use_by.get(tournament_id, 0)
+
+    async def acquire(self, tournament_id: int):
+        """
+        Wait for a match slot for a tournament, which must be registered.
+        Raises ValueError for a tournament that isn't, or was unregistered.
+        """
+        if tournament_id not in self._weights:
+            raise ValueError(f"Tournament {tournament_id} is not registered with the scheduler")
+        waiting = any(self._waiters.values())
+        if self.in_use < self.capacity and not waiting:
+            self._grant(tournament_id)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[tournament_id].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we were cancelled: hand the slot back
+                self.release(tournament_id)
+            elif waiter in self._waiters.get(tournament_id, ()):
+                self._waiters[tournament_id].remove(waiter)
+            raise
+
+    def release(self, tournament_id: int):
+        self.in_use -= 1
+        if tournament_id in self._in_use_by:
+            self._in_use_by[tournament_id] -= 1
+        self._dispatch()
+
+    def _grant(self, tournament_id: int):
+        self.in_use += 1
+        self._in_use_by[tournament_id] += 1
+        self._virtual_time[tournament_id] += 1.0 / self._weights[tournament_id]
+
+    def _dispatch(self):
+        while self.in_use < self.capacity:
+            backlogged = [t for t, waiters in self._waiters.items() if waiters]
+            if not backlogged:
+                return
+            tournament_id = min(backlogged, key=lambda t: self._virtual_time[t])
+            waiter = self._waiters[tournament_id].popleft()
+            if waiter.cancelled():
+                continue
+            self._grant(tournament_id)
+            waiter.set_result(None)
+
+
+# Create a singleton instance
+fair_scheduler = FairShareScheduler()
@@ -0,0 +1,89 @@
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class GroupStage:
+    """
+    Round robins inside balanced groups; the top `advance` of each group go through.
+    """
+
+    def __init__(self, group_size: int, advance: int):
+        if group_size < 2:
+            raise ValueError("Groups need at least 2 agents")
+        if not 1 <= advance < group_size:
+            raise ValueError("Agents advancing per group must be at least 1 and less than the group size")
+        self.group_size = group_size
+        self.advance = advance
+
+
+class KnockoutStage:
+    """
+    Single elimination; each tie is best of `best_of` matches.
+    Plays until one agent is left.
+    """
+
+    def __init__(self, best_of: int = 1):
+        if best_of < 1 or best_of % 2 == 0:
+            raise ValueError("Knockout ties must be best of an odd number of matches")
+        self.best_of = best_of
+
+
+def seed_groups(seeds: Sequence[int], group_size: int) -> List[List[int]]:
+    """
+    Split seeded agents (strongest first) into groups of at most group_size,
+    snake-style, so group strength and sizes are balanced.
+    """
+    group_count = max(1, math.ceil(len(seeds) / group_size))
+    groups = [[] for _ in range(group_count)]
+    for i, agent_id in enumerate(seeds):
+        lap, position = divmod(i, group_count)
+        groups[position if lap % 2 == 0 else group_count - 1 - position].append(agent_id)
+    return groups
+
+
+def group_qualifiers(seeds: Sequence[int], groups: Sequence[Sequence[int]],
+                     scores: Dict[int, float], advance: int) -> List[int]:
+    """
+    Agents advancing from a group stage, seeded for the next stage:
+    all group winners first, then all runners-up, and so on,
+    each tier ordered by stage score. Ties go to the better seed.
+    """
+    seed_rank = {agent_id: i for i, agent_id in enumerate(seeds)}
+
+    def standing(agent_id: int):
+        return -scores.get(agent_id, 0.0), seed_rank[agent_id]
+
+    tiers = defaultdict(list)
+    for group in groups:
+        for place, agent_id in enumerate(sorted(group, key=standing)[:advance]):
+            tiers[place].append(agent_id)
+    qualifiers = []
+    for place in sorted(tiers):
+        qualifiers.extend(sorted(tiers[place], key=standing))
+    return qualifiers
+
+
+def bracket_order(size: int) -> List[int]:
+    """
+    Seed indices in bracket position order for a power-of-two bracket,
+    so seeds 1 and 2 can only meet in the final.
+    """
+    order = [0]
+    while len(order) < size:
+        width = len(order) * 2
+        order = [seed for position in order for seed in (position, width - 1 - position)]
+    return order
+
+
+def knockout_ties(seeds: Sequence[int]) -> List[Tuple[int, Optional[int]]]:
+    """
+    First knockout round for seeded agents. The bracket is padded to a power
+    of two with byes for the top seeds; a bye is a tie against None.
+    """
+    size = 1
+    while size < len(seeds):
+        size *= 2
+    order = bracket_order(size)
+    slots = [seeds[i] if i < len(seeds) else None for i in order]
+    return [(slots[i], slots[i + 1]) for i in range(0, size, 2)]
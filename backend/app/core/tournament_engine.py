@@ -1,18 +1,116 @@
 import asyncio
 import logging
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from app.db.database import SessionLocal
+from app.db.database import SessionLocal, read_session
 from app.models.models import Tournament, Match, Agent, Round, MoveType
 from app.routers.matches import execute_match
+from app.core.events import event_hub, tournament_topic
+from app.core.agent_stats import aggregate_agent_stats_now
+from app.core.game import GameSpec, compile_game_spec
+from app.core.agent_transport import DEFAULT_AGENT_MAX_CONCURRENCY
+from app.core.scheduler import fair_scheduler
+from app.core.loop_monitor import loop_monitor
+from app.core.fast_run import FastRun, MatchState, FAST_RUN_CHECKPOINT_MATCHES
+from app.core.stages import GroupStage, KnockoutStage, seed_groups, group_qualifiers, knockout_ties
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+# Pending matches inspected when choosing the next match to start
+SCHEDULER_LOOKAHEAD = 256
+
+def round_robin_pairings(items: List) -> List[List[tuple]]:
+    """
+    Split a full round robin into pairing rounds using the circle method.
+    Every item appears at most once per round, so consecutive matches spread
+    across all agents instead of lining up behind one.
+    """
+    players = list(items)
+    if len(players) % 2:
+        players.append(None)  # bye
+    n = len(players)
+    rounds = []
+    for r in range(n - 1):
+        pairs = []
+        for k in range(n // 2):
+            a, b = players[k], players[n - 1 - k]
+            if a is None or b is None:
+                continue
+            # Alternate the fixed player's side so sides stay balanced
+            if k == 0 and r % 2:
+                a, b = b, a
+            pairs.append((a, b))
+        rounds.append(pairs)
+        # Keep the first player fixed and rotate the rest
+        players = [players[0], players[-1]] + players[1:-1]
+    return rounds
+
+def elo_pairings(agents: List[Agent]) -> List[tuple]:
+    """
+    Pair agents with similar ratings: each agent plays the next 2-3 agents by average score.
+    """
+    # Sort agents by average score
+    agents = sorted(agents, key=lambda a: a.average_score if a.average_score is not None else 0, reverse=True)
+    
+    pairs = []
+    # Match agents with similar ratings
+    for i in range(len(agents)):
+        # Each agent plays against 2-3 others with similar ratings
+        for j in range(1, min(4, len(agents))):
+            opponent_idx = (i + j) % len(agents)
+            pairs.append((agents[i], agents[opponent_idx]))
+    return pairs
+
+def matchmaking_pairings(agents: List[Agent], matchmaking_type: str) -> List[tuple]:
+    """
+    All (agent_a, agent_b) pairs a matchmaking type would schedule, in scheduling order.
+    """
+    if matchmaking_type == "round_robin":
+        return [pair for pairing_round in round_robin_pairings(agents) for pair in pairing_round]
+    if matchmaking_type == "elo":
+        return elo_pairings(agents)
+    raise ValueError(f"Unknown matchmaking type: {matchmaking_type}")
+
+class TournamentProgress:
+    """
+    In-memory progress counters for a tournament running in this process.
+    """
+    
+    def __init__(self, total_matches: int, completed_matches: int = 0):
+        self.total_matches = total_matches
+        self.completed_matches = completed_matches
+        self.failed_matches = 0
+        self.rounds_played = 0
+        self.started_at = time.monotonic()
+        self._completed_at_start = completed_matches
+    
+    def record_round(self, count: int = 1):
+        self.rounds_played += count
+    
+    def record_match(self, failed: bool = False):
+        if failed:
+            self.failed_matches += 1
+        else:
+            self.completed_matches += 1
+    
+    def eta_seconds(self) -> Optional[float]:
+        """
+        Estimate the remaining run time from the match completion rate observed so far.
+        """
+        finished = self.completed_matches - self._completed_at_start + self.failed_matches
+        if finished <= 0:
+            return None
+        elapsed = time.monotonic() - self.started_at
+        remaining = self.total_matches - self.completed_matches - self.failed_matches
+        return max(remaining, 0) * elapsed / finished
+
 class TournamentEngine:
     """
     Tournament Engine for scheduling and running Prisoner's Dilemma tournaments.
@@ -20,6 +118,7 @@ class TournamentEngine:
     
     def __init__(self):
         self.running_tournaments = set()
+        self.progress: Dict[int, TournamentProgress] = {}
     
     async def schedule_tournament(self, tournament_id: int, matchmaking_type: str = "round_robin"):
         """
@@ -75,14 +174,13 @@ class TournamentEngine:
     async def _schedule_round_robin(self, db: Session, tournament: Tournament, agents: List[Agent]):
         """
         Schedule round-robin matches where each agent plays against all others.
+        Matches are created pairing round by pairing round, so each wave of
+        concurrently running matches has every agent at most once.
         """
         matches_created = 0
         
-        for i in range(len(agents)):
-            for j in range(i + 1, len(agents)):
-                agent_a = agents[i]
-                agent_b = agents[j]
-                
+        for pairing_round in round_robin_pairings(agents):
+            for agent_a, agent_b in pairing_round:
                 # Create match
                 match = Match(
                     tournament_id=tournament.id,
@@ -102,41 +200,38 @@ class TournamentEngine:
         """
         Schedule matches based on Elo ratings (agents with similar scores play each other).
         """
-        # Sort agents by average score
-        agents.sort(key=lambda a: a.average_score if a.average_score is not None else 0, reverse=True)
-        
         matches_created = 0
         
-        # Match agents with similar ratings
-        for i in range(len(agents)):
-            # Each agent plays against 2-3 others with similar ratings
-            for j in range(1, min(4, len(agents))):
-                opponent_idx = (i + j) % len(agents)
-                agent_a = agents[i]
-                agent_b = agents[opponent_idx]
-                
-                # Create match
-                match = Match(
-                    tournament_id=tournament.id,
-                    agent_a_id=agent_a.id,
-                    agent_b_id=agent_b.id,
-                    is_complete=False,
-                    rounds_completed=0
-                )
-                
-                db.add(match)
-                matches_created += 1
+        for agent_a, agent_b in elo_pairings(agents):
+            # Create match
+            match = Match(
+                tournament_id=tournament.id,
+                agent_a_id=agent_a.id,
+                agent_b_id=agent_b.id,
+                is_complete=False,
+                rounds_completed=0
+            )
+            
+            db.add(match)
+            matches_created += 1
         
         db.commit()
         logger.info(f"Created {matches_created} Elo-based matches for tournament {tournament.id}")
     
-    async def run_tournament(self, tournament_id: int, concurrent_matches: int = 5):
+    async def run_tournament(self, tournament_id: int, concurrent_matches: int = 5, weight: float = 1.0,
+                             fast: bool = False, checkpoint_matches: int = FAST_RUN_CHECKPOINT_MATCHES,
+                             complete_when_done: bool = True):
         """
         Run all matches in a tournament.
         
         Args:
             tournament_id: ID of the tournament to run
-            concurrent_matches: Number of matches to run concurrently
+            concurrent_matches: Maximum number of this tournament's matches in flight
+            weight: Share of the engine-wide match budget relative to other running tournaments
+            fast: Play matches in memory and write results in bulk at checkpoints,
+                instead of committing every round
+            checkpoint_matches: In fast mode, completed matches per bulk write; 0 writes once at the end
+            complete_when_done: Mark the tournament complete once no matches are left
         """
         logger.info(f"Starting tournament {tournament_id} with {concurrent_matches} concurrent matches")
         
@@ -160,11 +255,12 @@ class TournamentEngine:
             pending_matches = db.query(Match).filter(
                 Match.tournament_id == tournament_id,
                 Match.is_complete == False
-            ).all()
+            ).order_by(Match.id).all()
             
             if not pending_matches:
                 logger.warning(f"No pending matches found for tournament {tournament_id}")
-                self._complete_tournament(db, tournament)
+                if complete_when_done:
+                    self._complete_tournament(db, tournament)
                 self.running_tournaments.remove(tournament_id)
                 return True
             
@@ -172,28 +268,62 @@ class TournamentEngine:
             total_matches = len(pending_matches)
             completed = 0
             
+            already_completed = db.query(func.count(Match.id)).filter(
+                Match.tournament_id == tournament_id,
+                Match.is_complete == True
+            ).scalar()
+            progress = TournamentProgress(already_completed + total_matches, already_completed)
+            self.progress[tournament_id] = progress
+            fair_scheduler.register(tournament_id, weight)
+            
+            # Compile the game once for every match in the run
+            game_spec = compile_game_spec(tournament)
+            
             logger.info(f"Running {total_matches} matches for tournament {tournament_id}")
             
-            # Process matches in batches
-            for i in range(0, total_matches, concurrent_matches):
-                batch = pending_matches[i:i+concurrent_matches]
-                tasks = []
-                
-                for match in batch:
-                    # Create a new session for each match
-                    match_session = SessionLocal()
-                    tasks.append(
-                        execute_match(
-                            match_id=match.id,
-                            round_count=tournament.round_count,
-                            db_session=match_session
+            # In-flight caps declared by the participating agents
+            agent_ids = {m.agent_a_id for m in pending_matches} | {m.agent_b_id for m in pending_matches}
+            agent_caps = {
+                agent_id: cap or DEFAULT_AGENT_MAX_CONCURRENCY
+                for agent_id, cap in db.query(Agent.id, Agent.max_concurrent_requests).filter(Agent.id.in_(agent_ids)).all()
+            }
+            agent_load = defaultdict(int)
+            
+            fast_run = None
+            if fast:
+                fast_run = FastRun(db, tournament_id, pending_matches, tournament.round_count, game_spec, checkpoint_matches)
+            
+            # Keep a sliding window of matches in flight, refilling each freed slot
+            # with a match whose agents still have spare capacity. The window
+            # shrinks while the event loop is lagging, so API latency stays bounded
+            pending = list(pending_matches)
+            in_flight = {}
+            while pending or in_flight:
+                while pending and len(in_flight) < loop_monitor.match_window(concurrent_matches):
+                    match = self._pick_next_match(pending, agent_load, agent_caps)
+                    agent_load[match.agent_a_id] += 1
+                    agent_load[match.agent_b_id] += 1
+                    if fast_run is not None:
+                        task = asyncio.create_task(self._run_match_in_memory(tournament_id, match, fast_run, progress))
+                    else:
+                        task = asyncio.create_task(
+                            self._run_match(tournament_id, match.id, tournament.round_count, game_spec, progress)
                         )
-                    )
+                    in_flight[task] = match
                 
-                # Wait for all matches in this batch to complete
-                await asyncio.gather(*tasks)
-                completed += len(batch)
-                logger.info(f"Completed {completed}/{total_matches} matches for tournament {tournament_id}")
+                done, _ = await asyncio.wait(in_flight.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    match = in_flight.pop(task)
+                    agent_load[match.agent_a_id] -= 1
+                    agent_load[match.agent_b_id] -= 1
+                    if fast_run is not None:
+                        await fast_run.add_result(task.result())
+                    completed += 1
+                    if completed % concurrent_matches == 0 or completed == total_matches:
+                        logger.info(f"Completed {completed}/{total_matches} matches for tournament {tournament_id}")
+            
+            if fast_run is not None:
+                await fast_run.flush()
             
             # Check if all matches are complete
             incomplete_count = db.query(Match).filter(
@@ -201,9 +331,13 @@ class TournamentEngine:
                 Match.is_complete == False
             ).count()
             
+            # Roll this tournament's results into the agent stats right away, off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, aggregate_agent_stats_now)
+            
             if incomplete_count == 0:
-                self._complete_tournament(db, tournament)
-                logger.info(f"Tournament {tournament_id} completed successfully")
+                if complete_when_done:
+                    self._complete_tournament(db, tournament)
+                    logger.info(f"Tournament {tournament_id} completed successfully")
             else:
                 logger.warning(f"Tournament {tournament_id} has {incomplete_count} incomplete matches")
             
@@ -215,8 +349,260 @@ class TournamentEngine:
         finally:
             if tournament_id in self.running_tournaments:
                 self.running_tournaments.remove(tournament_id)
+            self.progress.pop(tournament_id, None)
+            fair_scheduler.unregister(tournament_id)
+            db.close()
+    
+    async def run_staged_tournament(self, tournament_id: int, stages: List, concurrent_matches: int = 5,
+                                    weight: float = 1.0, fast: bool = False):
+        """
+        Run a tiered tournament: group stages and/or a single-elimination knockout.
+        Agents are seeded by average score; each stage is scheduled only once
+        the previous one has completed, and its survivors seed the next.
+        
+        Args:
+            tournament_id: ID of the tournament to run
+            stages: GroupStage and KnockoutStage instances, in order
+            concurrent_matches: Maximum number of this tournament's matches in flight
+            weight: Share of the engine-wide match budget relative to other running tournaments
+            fast: Play each stage in memory (see run_tournament)
+        """
+        logger.info(f"Starting staged tournament {tournament_id} with {len(stages)} stages")
+        
+        db = SessionLocal()
+        try:
+            tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+            if not tournament:
+                logger.error(f"Tournament {tournament_id} not found")
+                return False
+            
+            # Same eligibility rule as scheduling, strongest first
+            eligible_agents = db.query(Agent).filter(
+                Agent.is_active == True,
+                Agent.is_quarantined == False
+            ).all()
+            eligible_agents.sort(key=lambda a: a.average_score if a.average_score is not None else 0, reverse=True)
+            seeds = [agent.id for agent in eligible_agents]
+            
+            if len(seeds) < 2:
+                logger.error(f"Not enough eligible agents for tournament {tournament_id}")
+                return False
+            
+            tournament.start_time = datetime.now()
+            db.commit()
+            
+            stage_number = 0
+            for stage in stages:
+                if len(seeds) < 2:
+                    break
+                if isinstance(stage, GroupStage):
+                    groups = seed_groups(seeds, stage.group_size)
+                    for group_number, group in enumerate(groups):
+                        for pairing_round in round_robin_pairings(group):
+                            for agent_a_id, agent_b_id in pairing_round:
+                                self._add_stage_match(db, tournament_id, agent_a_id, agent_b_id, stage_number, group_number)
+                    db.commit()
+                    logger.info(f"Stage {stage_number} of tournament {tournament_id}: {len(groups)} groups of {len(seeds)} agents")
+                    
+                    if not await self._run_stage(db, tournament_id, stage_number, concurrent_matches, weight, fast):
+                        return False
+                    seeds = group_qualifiers(seeds, groups, self._stage_mean_scores(db, tournament_id, stage_number), stage.advance)
+                    stage_number += 1
+                elif isinstance(stage, KnockoutStage):
+                    seeds, stage_number = await self._run_knockout(
+                        db, tournament_id, seeds, stage, stage_number, concurrent_matches, weight, fast
+                    )
+                    if seeds is None:
+                        return False
+                else:
+                    raise ValueError(f"Unknown stage type: {type(stage).__name__}")
+            
+            logger.info(f"Staged tournament {tournament_id} finished; top seeds: {seeds[:8]}")
+            self._complete_tournament(db, tournament)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error running staged tournament {tournament_id}: {str(e)}")
+            db.rollback()
+            return False
+        finally:
             db.close()
     
+    async def _run_knockout(self, db: Session, tournament_id: int, seeds: List[int], stage: KnockoutStage,
+                            stage_number: int, concurrent_matches: int, weight: float, fast: bool):
+        """
+        Play a knockout to the end, one stage number per knockout round.
+        Ties are best of stage.best_of, playing only the legs still needed;
+        sides alternate each leg. Returns ([champion], next stage number), or (None, ...) on failure.
+        """
+        seed_rank = {agent_id: i for i, agent_id in enumerate(seeds)}
+        needed = stage.best_of // 2 + 1
+        ties = knockout_ties(seeds)
+        while True:
+            results = {}
+            for leg in range(stage.best_of):
+                undecided = [
+                    i for i, (agent_a_id, agent_b_id) in enumerate(ties)
+                    if agent_a_id is not None and agent_b_id is not None
+                    and max(results.get(i, {}).get(agent_id, (0, 0.0))[0] for agent_id in (agent_a_id, agent_b_id)) < needed
+                ]
+                if not undecided:
+                    break
+                for i in undecided:
+                    agent_a_id, agent_b_id = ties[i] if leg % 2 == 0 else ties[i][::-1]
+                    self._add_stage_match(db, tournament_id, agent_a_id, agent_b_id, stage_number, i)
+                db.commit()
+                
+                if not await self._run_stage(db, tournament_id, stage_number, concurrent_matches, weight, fast):
+                    return None, stage_number
+                results = self._tie_results(db, tournament_id, stage_number)
+            
+            # Most wins, then most points over the tie, then the better seed
+            winners = []
+            for i, (agent_a_id, agent_b_id) in enumerate(ties):
+                if agent_a_id is None or agent_b_id is None:
+                    winners.append(agent_a_id if agent_b_id is None else agent_b_id)
+                    continue
+                tally = results.get(i, {})
+                winners.append(min(
+                    (agent_a_id, agent_b_id),
+                    key=lambda agent_id: (-tally.get(agent_id, (0, 0.0))[0], -tally.get(agent_id, (0, 0.0))[1], seed_rank[agent_id])
+                ))
+            
+            logger.info(f"Knockout round {stage_number} of tournament {tournament_id}: {len(winners)} agents through")
+            stage_number += 1
+            if len(winners) == 1:
+                return winners, stage_number
+            ties = [(winners[i], winners[i + 1]) for i in range(0, len(winners), 2)]
+    
+    def _add_stage_match(self, db: Session, tournament_id: int, agent_a_id: int, agent_b_id: int,
+                         stage_number: int, group_number: int):
+        db.add(Match(
+            tournament_id=tournament_id,
+            agent_a_id=agent_a_id,
+            agent_b_id=agent_b_id,
+            is_complete=False,
+            rounds_completed=0,
+            stage=stage_number,
+            group_number=group_number
+        ))
+    
+    async def _run_stage(self, db: Session, tournament_id: int, stage_number: int,
+                         concurrent_matches: int, weight: float, fast: bool) -> bool:
+        """
+        Run the pending matches of a stage; False if any of them didn't complete.
+        """
+        await self.run_tournament(tournament_id, concurrent_matches, weight, fast=fast, complete_when_done=False)
+        db.expire_all()
+        incomplete_count = db.query(func.count(Match.id)).filter(
+            Match.tournament_id == tournament_id,
+            Match.stage == stage_number,
+            Match.is_complete == False
+        ).scalar()
+        if incomplete_count:
+            logger.error(f"Stage {stage_number} of tournament {tournament_id} has {incomplete_count} incomplete matches")
+            return False
+        return True
+    
+    def _stage_mean_scores(self, db: Session, tournament_id: int, stage_number: int) -> Dict[int, float]:
+        """
+        Each agent's mean score per match in a stage, so groups of different sizes compare fairly.
+        """
+        totals = defaultdict(float)
+        counts = defaultdict(int)
+        for agent_a_id, agent_b_id, score_a, score_b in db.query(
+            Match.agent_a_id, Match.agent_b_id, Match.agent_a_score, Match.agent_b_score
+        ).filter(Match.tournament_id == tournament_id, Match.stage == stage_number).all():
+            totals[agent_a_id] += score_a or 0.0
+            totals[agent_b_id] += score_b or 0.0
+            counts[agent_a_id] += 1
+            counts[agent_b_id] += 1
+        return {agent_id: totals[agent_id] / counts[agent_id] for agent_id in counts}
+    
+    def _tie_results(self, db: Session, tournament_id: int, stage_number: int) -> Dict[int, Dict[int, tuple]]:
+        """
+        Per knockout tie: each agent's (matches won, points scored) so far.
+        """
+        results = defaultdict(dict)
+        for tie, agent_a_id, agent_b_id, score_a, score_b in db.query(
+            Match.group_number, Match.agent_a_id, Match.agent_b_id, Match.agent_a_score, Match.agent_b_score
+        ).filter(Match.tournament_id == tournament_id, Match.stage == stage_number).all():
+            score_a = score_a or 0.0
+            score_b = score_b or 0.0
+            for agent_id, own, other in ((agent_a_id, score_a, score_b), (agent_b_id, score_b, score_a)):
+                wins, points = results[tie].get(agent_id, (0, 0.0))
+                results[tie][agent_id] = (wins + (own > other), points + own)
+        return results
+    
+    def _pick_next_match(self, pending: List[Match], agent_load: Dict[int, int], agent_caps: Dict[int, int]) -> Match:
+        """
+        Take the first pending match (within a lookahead window) whose agents both have spare capacity.
+        Falls back to the least loaded candidate when every agent in the window is saturated.
+        """
+        best_index = 0
+        best_load = None
+        for i in range(min(len(pending), SCHEDULER_LOOKAHEAD)):
+            match = pending[i]
+            load = max(
+                agent_load[match.agent_a_id] / agent_caps.get(match.agent_a_id, DEFAULT_AGENT_MAX_CONCURRENCY),
+                agent_load[match.agent_b_id] / agent_caps.get(match.agent_b_id, DEFAULT_AGENT_MAX_CONCURRENCY)
+            )
+            if load < 1:
+                best_index = i
+                break
+            if best_load is None or load < best_load:
+                best_index, best_load = i, load
+        return pending.pop(best_index)
+    
+    async def _run_match(self, tournament_id: int, match_id: int, round_count: int,
+                         game_spec: GameSpec, progress: TournamentProgress):
+        """
+        Execute a single match in its own session and record the outcome in the progress counters.
+        Waits for a slot from the engine-wide fair-share scheduler first.
+        """
+        await fair_scheduler.acquire(tournament_id)
+        
+        # Create a new session for each match
+        match_session = SessionLocal()
+        try:
+            completed = await execute_match(
+                match_id=match_id,
+                round_count=round_count,
+                db_session=match_session,
+                on_round=progress.record_round,
+                game_spec=game_spec
+            )
+            if not completed:
+                logger.warning(f"Match {match_id} was not played: the match or one of its agents is gone")
+            progress.record_match(failed=not completed)
+        except Exception as e:
+            logger.error(f"Error executing match {match_id}: {str(e)}")
+            match_session.rollback()
+            progress.record_match(failed=True)
+        finally:
+            match_session.close()
+            fair_scheduler.release(tournament_id)
+    
+    async def _run_match_in_memory(self, tournament_id: int, match: Match, fast_run: FastRun,
+                                   progress: TournamentProgress) -> Optional[MatchState]:
+        """
+        Play a single match in memory for a fast run; nothing is written until the next checkpoint.
+        Waits for a slot from the engine-wide fair-share scheduler first.
+        """
+        await fair_scheduler.acquire(tournament_id)
+        try:
+            state = await fast_run.play(match)
+            if state is not None:
+                progress.record_round(len(state.moves_a) - state.first_round)
+            progress.record_match(failed=state is None)
+            return state
+        except Exception as e:
+            logger.error(f"Error executing match {match.id}: {str(e)}")
+            progress.record_match(failed=True)
+            return None
+        finally:
+            fair_scheduler.release(tournament_id)
+    
     def _complete_tournament(self, db: Session, tournament: Tournament):
         """
         Mark a tournament as complete and update end time.
@@ -224,34 +610,57 @@ class TournamentEngine:
         tournament.is_active = False
         tournament.end_time = datetime.now()
         db.commit()
+        
+        event_hub.publish(tournament_topic(tournament.id), "tournament_completed", {
+            "tournament_id": tournament.id,
+            "end_time": tournament.end_time
+        })
     
     async def get_tournament_status(self, tournament_id: int):
         """
         Get the current status of a tournament.
         """
+        # Read from the primary, not the replica: a finished run's live counters are
+        # dropped at once, and a lagging replica would then report it unfinished
         db = SessionLocal()
         try:
             tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
             if not tournament:
                 return {"error": "Tournament not found"}
             
-            total_matches = db.query(func.count(Match.id)).filter(
-                Match.tournament_id == tournament_id
-            ).scalar()
-            
-            completed_matches = db.query(func.count(Match.id)).filter(
-                Match.tournament_id == tournament_id,
-                Match.is_complete == True
-            ).scalar()
+            progress = self.progress.get(tournament_id)
+            if progress is not None:
+                # Running in this process: serve the live counters without touching matches
+                total_matches = progress.total_matches
+                completed_matches = progress.completed_matches
+                failed_matches = progress.failed_matches
+                rounds_played = progress.rounds_played
+                eta_seconds = progress.eta_seconds()
+            else:
+                counts = dict(
+                    db.query(Match.is_complete, func.count(Match.id)).filter(
+                        Match.tournament_id == tournament_id
+                    ).group_by(Match.is_complete).all()
+                )
+                completed_matches = counts.get(True, 0)
+                total_matches = completed_matches + counts.get(False, 0) + counts.get(None, 0)
+                failed_matches = None
+                rounds_played = None
+                eta_seconds = None
             
             return {
                 "tournament_id": tournament_id,
                 "name": tournament.name,
                 "is_active": tournament.is_active,
+                "is_running": progress is not None,
+                "active_matches": fair_scheduler.active_matches(tournament_id),
                 "start_time": tournament.start_time,
                 "end_time": tournament.end_time,
                 "total_matches": total_matches,
                 "completed_matches": completed_matches,
+                "failed_matches": failed_matches,
+                "rounds_played": rounds_played,
+                "eta_seconds": eta_seconds,
                 "progress": f"{completed_matches}/{total_matches}",
                 "percent_complete": (completed_matches / total_matches * 100) if total_matches > 0 else 0
             }
@@ -266,7 +675,7 @@ class TournamentEngine:
             tournament_id: Optional tournament ID to filter results
             timeframe: Time period for the leaderboard ("daily", "weekly", "all")
         """
-        db = SessionLocal()
+        db = read_session()
         try:
             query = db.query(Agent)
             
@@ -0,0 +1,117 @@
+import hashlib
+import logging
+import os
+import random
+from typing import Container, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.game import GameSpec
+from app.models.models import Agent, TranscriptCache
+
+logger = logging.getLogger(__name__)
+
+# Fraction of memoizable matches that are played live anyway to check the cached transcript
+TRANSCRIPT_VERIFY_RATE = float(os.getenv("TRANSCRIPT_VERIFY_RATE", "0.02"))
+
+
+class TranscriptKey:
+    """
+    Cache key for a match between two deterministic agents.
+    Transcripts are stored with the lower agent id as side A; `flipped`
+    records that this match has the agents the other way round.
+    """
+
+    __slots__ = ("key", "flipped")
+
+    def __init__(self, key: str, flipped: bool):
+        self.key = key
+        self.flipped = flipped
+
+
+def transcript_key(agent_a: Agent, agent_b: Agent, game_spec: GameSpec, round_count: int) -> Optional[TranscriptKey]:
+    """
+    Key for a memoizable match, or None when the outcome can't be known in advance:
+    an agent isn't declared deterministic with a version, or the game has noise or a random length.
+    Moves don't depend on payoffs, so the payoff matrix isn't part of the key.
+    """
+    if not (agent_a.is_deterministic and agent_b.is_deterministic):
+        return None
+    if not (agent_a.strategy_version and agent_b.strategy_version):
+        return None
+    if game_spec.noise_probability or game_spec.continuation_probability is not None:
+        return None
+
+    flipped = agent_a.id > agent_b.id
+    low, high = (agent_b, agent_a) if flipped else (agent_a, agent_b)
+    raw = f"{low.id}:{low.strategy_version}:{high.id}:{high.strategy_version}:{round_count}"
+    return TranscriptKey(hashlib.sha256(raw.encode("utf-8")).hexdigest(), flipped)
+
+
+def lookup_transcript(db: Session, key: TranscriptKey) -> Optional[Tuple[bytes, bytes]]:
+    """
+    Cached (moves_a, moves_b) for the match, oriented to its agent order.
+    """
+    entry = db.query(TranscriptCache).filter(TranscriptCache.cache_key == key.key).first()
+    if entry is None:
+        return None
+    if key.flipped:
+        return entry.moves_b, entry.moves_a
+    return entry.moves_a, entry.moves_b
+
+
+def store_transcript(db: Session, key: TranscriptKey, moves_a: bytes, moves_b: bytes):
+    if key.flipped:
+        moves_a, moves_b = moves_b, moves_a
+    db.add(TranscriptCache(cache_key=key.key, moves_a=bytes(moves_a), moves_b=bytes(moves_b)))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another match between the same agents stored it first
+        db.rollback()
+
+
+def should_verify() -> bool:
+    return random.random() < TRANSCRIPT_VERIFY_RATE
+
+
+def verify_transcript(db: Session, key: TranscriptKey, cached: Tuple[bytes, bytes],
+                      moves_a: bytes, moves_b: bytes, agent_a: Agent, agent_b: Agent,
+                      failed_a: Container[int] = (), failed_b: Container[int] = ()) -> bool:
+    """
+    Compare a live replay against the cached transcript; failed_a/failed_b
+    are the rounds where that agent's call failed and DEFECT was played.
+    At the first diverging round both agents had seen identical histories, so
+    if exactly one agent answered differently it is not deterministic and
+    loses its declaration. A divergence caused by a failed call, or by both
+    agents at once, proves nothing about either; either way the cached
+    transcript is dropped.
+    """
+    cached_a, cached_b = cached
+    if bytes(moves_a) == bytes(cached_a) and bytes(moves_b) == bytes(cached_b):
+        return True
+
+    for i in range(min(len(moves_a), len(cached_a))):
+        if moves_a[i] != cached_a[i] or moves_b[i] != cached_b[i]:
+            diverged = [
+                (agent, failed)
+                for agent, live, stored, failed in (
+                    (agent_a, moves_a, cached_a, failed_a), (agent_b, moves_b, cached_b, failed_b)
+                )
+                if live[i] != stored[i]
+            ]
+            if len(diverged) == 1 and i not in diverged[0][1]:
+                agent = diverged[0][0]
+                logger.warning(
+                    f"Agent {agent.id} diverged from its cached transcript at round {i}; "
+                    f"revoking its deterministic declaration"
+                )
+                agent.is_deterministic = False
+            else:
+                logger.info(f"Replay diverged from cached transcript {key.key} at round {i}; dropping it")
+            break
+
+    db.query(TranscriptCache).filter(TranscriptCache.cache_key == key.key).delete(synchronize_session=False)
+    db.commit()
+    return False
@@ -1,9 +1,11 @@
 from app.db.database import Base, engine
-from app.models.models import Agent, Tournament, Match, Round, User, UserAgent, MoveType
+from app.db.partitions import create_default_rounds_partition
+from app.models.models import Agent, Tournament, Match, Round, User, UserAgent, AgentMatchStat, TranscriptCache, MoveType
 
 # Create all tables in the database
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    create_default_rounds_partition(engine)
 
 if __name__ == "__main__":
     create_tables()
@@ -0,0 +1,48 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# The rounds table is LIST-partitioned by tournament on PostgreSQL: each
+# tournament gets its own partition, and rounds of tournaments without one
+# land in the default partition. Other databases use a plain table.
+
+
+def _is_postgres(bind) -> bool:
+    return bind.dialect.name == "postgresql"
+
+
+def rounds_partition_name(tournament_id: int) -> str:
+    return f"rounds_t{int(tournament_id)}"
+
+
+def create_default_rounds_partition(engine):
+    if not _is_postgres(engine):
+        return
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS rounds_default PARTITION OF rounds DEFAULT"))
+
+
+def ensure_rounds_partition(db: Session, tournament_id: int):
+    """
+    Create the rounds partition for a tournament.
+    Call before the tournament has any rounds.
+    """
+    if not _is_postgres(db.get_bind()):
+        return
+    db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {rounds_partition_name(tournament_id)} "
+        f"PARTITION OF rounds FOR VALUES IN ({int(tournament_id)})"
+    ))
+
+
+def drop_tournament_rounds(db: Session, tournament_id: int):
+    """
+    Remove all hot-table rounds of a tournament, dropping its partition when it has one.
+    """
+    if _is_postgres(db.get_bind()):
+        name = rounds_partition_name(tournament_id)
+        exists = db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+        if exists is not None:
+            db.execute(text(f"ALTER TABLE rounds DETACH PARTITION {name}"))
+            db.execute(text(f"DROP TABLE {name}"))
+            return
+    db.execute(text("DELETE FROM rounds WHERE tournament_id = :tournament_id"), {"tournament_id": tournament_id})
@@ -4,6 +4,7 @@ from fastapi import FastAPI, Depends, HTTPException, status, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, JSONResponse
 
+import asyncio
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))  # DON'T CHANGE THIS !!!
@@ -40,6 +41,20 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+# Runtime metrics
+from app.core.loop_monitor import loop_monitor
+from app.core.agent_transport import agent_transport
+
+@app.get("/metrics", tags=["Health"])
+async def metrics():
+    hedge_budget = agent_transport.hedge_budget
+    return {
+        **loop_monitor.metrics(),
+        "agent_requests": hedge_budget.requests,
+        "agent_hedged_requests": hedge_budget.hedged_requests,
+        "agent_hedge_wins": hedge_budget.hedge_wins
+    }
+
 # Custom Swagger UI
 @app.get("/docs", include_in_schema=False)
 async def custom_swagger_ui_html(request: Request):
@@ -68,6 +83,22 @@ app.include_router(agents.router, prefix="/agents", tags=["Agents"])
 app.include_router(tournaments.router, prefix="/tournaments", tags=["Tournaments"])
 app.include_router(matches.router, prefix="/matches", tags=["Matches"])
 
+# Background jobs
+from app.core.agent_stats import run_periodic_aggregation
+from app.core.archive import run_periodic_archival
+from app.db.database import replica_guard
+
+@app.on_event("startup")
+async def start_background_jobs():
+    asyncio.create_task(run_periodic_aggregation())
+    asyncio.create_task(run_periodic_archival())
+    asyncio.create_task(loop_monitor.run())
+    asyncio.create_task(replica_guard.run())
+
+@app.on_event("shutdown")
+async def close_agent_transport():
+    await agent_transport.close()
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
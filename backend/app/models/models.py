@@ -1,10 +1,9 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Float, DateTime, Text, Enum
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Float, DateTime, Text, Enum, JSON, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 
-Base = declarative_base()
+from app.db.database import Base
 
 class MoveType(str, enum.Enum):
     COOPERATE = "C"
@@ -21,6 +20,12 @@ class Agent(Base):
     api_key = Column(String, unique=True, index=True, nullable=False)
     is_active = Column(Boolean, default=True)
     is_quarantined = Column(Boolean, default=True)
+    max_concurrent_requests = Column(Integer, default=4)  # in-flight callback requests the agent accepts
+    max_requests_per_second = Column(Float, nullable=True)  # optional pacing; null for unpaced
+    is_deterministic = Column(Boolean, default=False)  # moves depend only on the history
+    strategy_version = Column(String, nullable=True)  # changes whenever the strategy does
+    max_lookahead = Column(Integer, default=0)  # rounds of conditional policy the agent may return; 0 to opt out
+    strategy_fsm = Column(JSON, nullable=True)  # declarative state machine run by the server instead of calling the agent
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -48,6 +53,15 @@ class Tournament(Base):
     round_count = Column(Integer, default=200)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    # Game spec
+    payoff_matrix = Column(JSON, nullable=True)  # {"CC": [a, b], "CD": ..., "DC": ..., "DD": ...}; null for the standard game
+    noise_probability = Column(Float, default=0.0)  # chance each played move is flipped
+    continuation_probability = Column(Float, nullable=True)  # geometric match length capped at round_count; null for fixed length
+    
+    # Archival
+    archived_at = Column(DateTime(timezone=True), nullable=True)
+    archive_path = Column(String, nullable=True)  # compressed rounds segment once moved out of the hot table
+    
     # Relationships
     matches = relationship("Match", back_populates="tournament")
     
@@ -67,6 +81,8 @@ class Match(Base):
     is_complete = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    stage = Column(Integer, nullable=True)  # stage of a tiered tournament; null for single-stage formats
+    group_number = Column(Integer, nullable=True)  # group within a group stage, or tie within a knockout round
     
     # Relationships
     tournament = relationship("Tournament", back_populates="matches")
@@ -79,9 +95,12 @@ class Match(Base):
 
 class Round(Base):
     __tablename__ = "rounds"
+    # One partition per tournament on PostgreSQL (see app/db/partitions.py)
+    __table_args__ = {"postgresql_partition_by": "LIST (tournament_id)"}
     
-    id = Column(Integer, primary_key=True, index=True)
-    match_id = Column(Integer, ForeignKey("matches.id"))
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    tournament_id = Column(Integer, ForeignKey("tournaments.id"), primary_key=True)
+    match_id = Column(Integer, ForeignKey("matches.id"), index=True)
     round_number = Column(Integer, nullable=False)
     agent_a_move = Column(Enum(MoveType), nullable=False)
     agent_b_move = Column(Enum(MoveType), nullable=False)
@@ -97,6 +116,50 @@ class Round(Base):
     def __repr__(self):
         return f"<Round {self.round_number}: {self.agent_a_move} vs {self.agent_b_move}>"
 
+class AgentMatchStat(Base):
+    """
+    Append-only ledger of per-match agent results.
+    Rolled up into the Agent stats columns by the stats aggregator.
+    """
+    __tablename__ = "agent_match_stats"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    agent_id = Column(Integer, ForeignKey("agents.id"), nullable=False, index=True)
+    match_id = Column(Integer, ForeignKey("matches.id"), nullable=False, index=True)
+    score = Column(Float, nullable=False)
+    is_aggregated = Column(Boolean, default=False, index=True)
+    
+    # Behaviour and latency summary, computed from the transcript at match end
+    rounds = Column(Integer, nullable=True)
+    agent_calls = Column(Integer, nullable=True)  # rounds the agent was called for, rather than resolved locally
+    timeouts = Column(Integer, nullable=True)
+    errors = Column(Integer, nullable=True)  # agent calls that got no valid move back, timeouts included
+    response_p50 = Column(Float, nullable=True)  # in milliseconds, over agent calls
+    response_p95 = Column(Float, nullable=True)  # in milliseconds, over agent calls
+    response_max = Column(Float, nullable=True)  # in milliseconds, over agent calls
+    cooperation_rate = Column(Float, nullable=True)
+    first_defection_round = Column(Integer, nullable=True)  # null if the agent never defected
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<AgentMatchStat agent={self.agent_id} match={self.match_id}>"
+
+class TranscriptCache(Base):
+    """
+    Known transcripts of matches between deterministic agents, replayed instead of played.
+    Moves are stored one byte per round (0 = cooperate, 1 = defect), lower agent id as side A.
+    """
+    __tablename__ = "transcript_cache"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, unique=True, index=True, nullable=False)
+    moves_a = Column(LargeBinary, nullable=False)
+    moves_b = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<TranscriptCache {self.cache_key[:12]}>"
+
 class User(Base):
     __tablename__ = "users"
     
@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
 import secrets
 import string
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.models import Agent
-from app.schemas.schemas import AgentCreate, AgentResponse
+from app.schemas.schemas import AgentCreate, AgentResponse, AgentSloEntry
 from app.routers.auth import get_current_active_user
+from app.core.loop_monitor import shed_when_overloaded
+from app.core.fsm import compile_fsm, FsmError
+from app.core.agent_stats import agent_slo_report
 
 router = APIRouter()
 
@@ -16,6 +20,18 @@ def generate_api_key(length=32):
     alphabet = string.ascii_letters + string.digits
     return ''.join(secrets.choice(alphabet) for _ in range(length))
 
+def _validate_strategy_fsm(agent: AgentCreate):
+    """
+    Reject a state machine strategy that can't be compiled.
+    """
+    try:
+        compile_fsm(agent.strategy_fsm)
+    except FsmError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 @router.post("/register", response_model=AgentResponse)
 async def register_agent(
     agent: AgentCreate,
@@ -34,6 +50,8 @@ async def register_agent(
             detail="Agent with this name already exists"
         )
     
+    _validate_strategy_fsm(agent)
+    
     # Generate API key
     api_key = generate_api_key()
     
@@ -43,6 +61,12 @@ async def register_agent(
         description=agent.description,
         callback_url=agent.callback_url,
         auth_token=agent.auth_token,
+        max_concurrent_requests=agent.max_concurrent_requests,
+        max_requests_per_second=agent.max_requests_per_second,
+        is_deterministic=agent.is_deterministic,
+        strategy_version=agent.strategy_version,
+        max_lookahead=agent.max_lookahead,
+        strategy_fsm=agent.strategy_fsm,
         api_key=api_key,
         is_active=True,
         is_quarantined=True  # New agents start in quarantine
@@ -59,12 +83,13 @@ async def get_agents(
     skip: int = 0,
     limit: int = 100,
     active_only: bool = False,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_active_user)
 ):
     """
     Get a list of all registered agents.
     Optional filtering for active agents only.
+    Served from the read replica when one is configured.
     """
     query = db.query(Agent)
     if active_only:
@@ -73,6 +98,19 @@ async def get_agents(
     agents = query.offset(skip).limit(limit).all()
     return agents
 
+@router.get("/slo", response_model=List[AgentSloEntry], dependencies=[Depends(shed_when_overloaded)])
+def get_agent_slo_report(
+    since: Optional[datetime] = None,
+    tournament_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Latency and reliability report per agent, worst first, aggregated from
+    per-match summaries. Optionally limited to matches since a time or to a tournament.
+    """
+    return agent_slo_report(db, since=since, tournament_id=tournament_id)
+
 @router.get("/{agent_id}", response_model=AgentResponse)
 async def get_agent(
     agent_id: int,
@@ -107,11 +145,19 @@ async def update_agent(
             detail="Agent not found"
         )
     
+    _validate_strategy_fsm(agent_update)
+    
     # Update fields
     db_agent.name = agent_update.name
     db_agent.description = agent_update.description
     db_agent.callback_url = agent_update.callback_url
     db_agent.auth_token = agent_update.auth_token
+    db_agent.max_concurrent_requests = agent_update.max_concurrent_requests
+    db_agent.max_requests_per_second = agent_update.max_requests_per_second
+    db_agent.is_deterministic = agent_update.is_deterministic
+    db_agent.strategy_version = agent_update.strategy_version
+    db_agent.max_lookahead = agent_update.max_lookahead
+    db_agent.strategy_fsm = agent_update.strategy_fsm
     
     db.commit()
     db.refresh(db_agent)
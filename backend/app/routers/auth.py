@@ -1,46 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from typing import Optional
+import os
+import time
 
 from app.db.database import get_db
 from app.models.models import User
 from app.schemas.schemas import UserCreate, UserResponse, Token, TokenData
+from app.core.ttl_cache import TTLCache
+from app.core.rate_limit import KeyedRateLimiter
+from app.core.password_hashing import verify_password_async, hash_password_async, PasswordHasherBusy
 
 # Security configuration
 SECRET_KEY = "YOUR_SECRET_KEY_HERE"  # Change in production
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Login throttling: token buckets per client IP and per account
+LOGIN_RATE_PER_IP = KeyedRateLimiter(rate=20 / 60, capacity=20)
+LOGIN_RATE_PER_ACCOUNT = KeyedRateLimiter(rate=5 / 60, capacity=5)
+
+# Registration throttling per client IP, separate from the login budget
+REGISTER_RATE_PER_IP = KeyedRateLimiter(rate=10 / 3600, capacity=10)
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+# Authenticated-user caches: decoded token -> subject, and subject -> user
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+token_subject_cache = TTLCache(maxsize=AUTH_CACHE_MAX_ENTRIES, ttl=AUTH_CACHE_TTL_SECONDS)
+user_cache = TTLCache(maxsize=AUTH_CACHE_MAX_ENTRIES, ttl=AUTH_CACHE_TTL_SECONDS)
+
 router = APIRouter()
 
 # Helper functions
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
 def get_user(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
-def authenticate_user(db: Session, email: str, password: str):
+async def authenticate_user(db: Session, email: str, password: str):
     user = get_user(db, email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return False
     return user
 
+def _create_user(db: Session, email: str, hashed_password: str):
+    db_user = User(email=email, hashed_password=hashed_password)
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+def _too_many_requests(retry_after: float):
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many attempts, try again later",
+        headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+    )
+
+def _hasher_busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, try again later",
+        headers={"Retry-After": "1"},
+    )
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -51,23 +81,43 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def invalidate_user_cache(email: str):
+    """
+    Drop a cached user so the next request reloads it from the database.
+    Call this whenever a user's record changes, e.g. on deactivation.
+    """
+    user_cache.pop(email)
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+    email = token_subject_cache.get(token)
+    if email is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            email: str = payload.get("sub")
+            if email is None:
+                raise credentials_exception
+            token_data = TokenData(email=email)
+        except JWTError:
             raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
-        raise credentials_exception
-    user = get_user(db, email=token_data.email)
+        email = token_data.email
+        # Never cache a token beyond its own expiry
+        exp = payload.get("exp")
+        token_ttl = exp - time.time() if exp is not None else None
+        token_subject_cache.set(token, email, ttl=token_ttl)
+    
+    user = user_cache.get(email)
     if user is None:
-        raise credentials_exception
+        user = get_user(db, email=email)
+        if user is None:
+            raise credentials_exception
+        # Detach so commits in this request's session don't expire the shared instance
+        db.expunge(user)
+        user_cache.set(email, user)
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
@@ -77,20 +127,36 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
 
 # Routes
 @router.post("/register", response_model=UserResponse)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = get_user(db, email=user.email)
+async def register_user(user: UserCreate, request: Request, db: Session = Depends(get_db)):
+    retry_after = REGISTER_RATE_PER_IP.hit(request.client.host if request.client else None)
+    if retry_after:
+        raise _too_many_requests(retry_after)
+    # Database work goes to the threadpool; only the hashing wait stays on the loop
+    db_user = await run_in_threadpool(get_user, db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(user.password)
-    db_user = User(email=user.email, hashed_password=hashed_password)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    try:
+        hashed_password = await hash_password_async(user.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    return await run_in_threadpool(_create_user, db, user.email, hashed_password)
 
 @router.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login_for_access_token(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db)
+):
+    retry_after = max(
+        LOGIN_RATE_PER_IP.hit(request.client.host if request.client else None),
+        LOGIN_RATE_PER_ACCOUNT.hit(form_data.username.lower())
+    )
+    if retry_after:
+        raise _too_many_requests(retry_after)
+    try:
+        user = await authenticate_user(db, form_data.username, form_data.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -106,3 +172,23 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(current_user: User = Depends(get_current_active_user)):
     return current_user
+
+@router.post("/users/{user_id}/deactivate", response_model=UserResponse)
+async def deactivate_user(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Deactivate a user account (admin only).
+    """
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    db_user = db.query(User).filter(User.id == user_id).first()
+    if db_user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    db_user.is_active = False
+    db.commit()
+    db.refresh(db_user)
+    invalidate_user_cache(db_user.email)
+    return db_user
@@ -1,28 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request, Response
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Callable, List, Optional
 from datetime import datetime
-import requests
+import httpx
 import json
 import asyncio
+import math
 import time
+from array import array
 
-from app.db.database import get_db
-from app.models.models import Match, Round, Agent, Tournament, MoveType
+from app.db.database import SessionLocal, get_db, get_read_db
+from app.models.models import Match, Round, Agent, Tournament, AgentMatchStat, MoveType
 from app.schemas.schemas import MatchCreate, MatchResponse, PlayRequest, PlayResponse, HistoryItem
 from app.routers.auth import get_current_active_user
+from app.core.loop_monitor import shed_when_overloaded
+from app.core.response_cache import match_response_cache, etag_matches, IMMUTABLE_CACHE_CONTROL
+from app.core.events import event_hub, sse_response, match_topic, tournament_topic
+from app.core.game import GameSpec, compile_game_spec, MOVES, MOVE_INDEX, DEFECT
+from app.core.agent_transport import agent_transport, AGENT_RESPONSE_TIMEOUT
+from app.core.agent_stats import summarize_agent_match
+from app.core.archive import archived_match_rounds
+from app.core.head_to_head import head_to_head_cache
+from app.core.fsm import compile_fsm, play_machines, FsmError
+from app.core.play_request import PlayRequestEncoder
+from app.core.policy import parse_policy, policy_step, PolicyError
+from app.core.transcripts import (
+    transcript_key, lookup_transcript, store_transcript, should_verify, verify_transcript
+)
 
 router = APIRouter()
 
-# Payoff matrix for Prisoner's Dilemma
-PAYOFF_MATRIX = {
-    # (agent_a_move, agent_b_move): (agent_a_score, agent_b_score)
-    (MoveType.COOPERATE, MoveType.COOPERATE): (3, 3),
-    (MoveType.COOPERATE, MoveType.DEFECT): (0, 5),
-    (MoveType.DEFECT, MoveType.COOPERATE): (5, 0),
-    (MoveType.DEFECT, MoveType.DEFECT): (1, 1)
-}
-
 @router.post("", response_model=MatchResponse)
 async def create_match(
     match: MatchCreate,
@@ -65,17 +72,18 @@ async def create_match(
     
     return db_match
 
-@router.get("", response_model=List[MatchResponse])
+@router.get("", response_model=List[MatchResponse], dependencies=[Depends(shed_when_overloaded)])
 async def get_matches(
     skip: int = 0,
     limit: int = 100,
     tournament_id: Optional[int] = None,
     agent_id: Optional[int] = None,
     completed_only: bool = False,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get a list of matches with optional filtering.
+    Served from the read replica when one is configured.
     """
     query = db.query(Match)
     
@@ -94,13 +102,21 @@ async def get_matches(
 @router.get("/{match_id}", response_model=MatchResponse)
 async def get_match(
     match_id: int,
+    request: Request,
     include_rounds: bool = False,
     db: Session = Depends(get_db)
 ):
     """
     Get details for a specific match by ID.
     Optionally include round details.
+    Completed matches are served from a cache of pre-serialized responses
+    with a strong ETag, and answer If-None-Match with 304.
     """
+    cache_key = (match_id, include_rounds)
+    cached = match_response_cache.get(cache_key)
+    if cached is not None:
+        return _cached_match_response(request, *cached)
+    
     match = db.query(Match).filter(Match.id == match_id).first()
     if match is None:
         raise HTTPException(
@@ -108,12 +124,89 @@ async def get_match(
             detail="Match not found"
         )
     
-    # Include rounds if requested
+    # Include rounds if requested, reading archived tournaments from their segment
+    rounds = None
     if include_rounds:
-        rounds = db.query(Round).filter(Round.match_id == match_id).order_by(Round.round_number).all()
-        match.rounds = rounds
+        tournament = match.tournament
+        if tournament is not None and tournament.archive_path is not None:
+            rounds = archived_match_rounds(tournament, match_id)
+        else:
+            rounds = [
+                _round_info(round_obj)
+                for round_obj in db.query(Round).filter(Round.match_id == match_id).order_by(Round.round_number).all()
+            ]
+    response = _match_response(match, rounds)
+    
+    # In-progress matches still change, so they bypass the cache
+    if not match.is_complete:
+        return response
+    
+    body = response.json().encode("utf-8")
+    return _cached_match_response(request, *match_response_cache.put(cache_key, body))
+
+def _round_info(round_obj: Round):
+    return {
+        "round_number": round_obj.round_number,
+        "agent_a_move": round_obj.agent_a_move,
+        "agent_b_move": round_obj.agent_b_move,
+        "agent_a_score": round_obj.agent_a_score,
+        "agent_b_score": round_obj.agent_b_score,
+        "agent_a_response_time": round_obj.agent_a_response_time,
+        "agent_b_response_time": round_obj.agent_b_response_time
+    }
+
+def _match_response(match: Match, rounds: Optional[List[dict]]) -> MatchResponse:
+    """
+    Build a MatchResponse without touching the rounds relationship.
+    """
+    return MatchResponse(
+        id=match.id,
+        tournament_id=match.tournament_id,
+        agent_a_id=match.agent_a_id,
+        agent_b_id=match.agent_b_id,
+        agent_a_score=match.agent_a_score,
+        agent_b_score=match.agent_b_score,
+        rounds_completed=match.rounds_completed,
+        is_complete=match.is_complete,
+        created_at=match.created_at,
+        completed_at=match.completed_at,
+        stage=match.stage,
+        group_number=match.group_number,
+        rounds=rounds
+    )
+
+def _cached_match_response(request: Request, body: bytes, etag: str):
+    """
+    Build the response for a cached match body, honouring If-None-Match.
+    """
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/{match_id}/stream")
+async def stream_match(
+    match_id: int,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Stream live round results for a match as Server-Sent Events.
+    Emits "round" events and a final "match_completed" event.
+    """
+    match = db.query(Match).filter(Match.id == match_id).first()
+    if match is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Match not found"
+        )
     
-    return match
+    return sse_response(
+        request,
+        match_topic(match_id),
+        terminal_events=("match_completed",),
+        snapshot=lambda: _match_completed_event(match_id)
+    )
 
 @router.post("/{match_id}/run", status_code=status.HTTP_202_ACCEPTED)
 async def run_match(
@@ -151,27 +244,46 @@ async def run_match(
         execute_match,
         match_id=match_id,
         round_count=tournament.round_count,
-        db_session=db
+        db_session=db,
+        game_spec=compile_game_spec(tournament)
     )
     
     return {"message": f"Match {match_id} scheduled for execution"}
 
-async def execute_match(match_id: int, round_count: int, db_session: Session):
+async def execute_match(
+    match_id: int,
+    round_count: int,
+    db_session: Session,
+    on_round: Optional[Callable[[int], None]] = None,
+    game_spec: Optional[GameSpec] = None
+) -> bool:
     """
     Execute a match between two agents.
     This runs in the background and updates the database as rounds are completed.
+    Returns False if the match or one of its agents no longer exists, True once it is complete.
+    If given, on_round is called with the number of rounds committed each time rounds are committed.
+    round_count is the maximum match length; the tournament's game spec may end it earlier.
     """
     # Get match details
     match = db_session.query(Match).filter(Match.id == match_id).first()
-    if match is None or match.is_complete:
-        return
+    if match is None:
+        return False
+    if match.is_complete:
+        return True
+    
+    if game_spec is None:
+        game_spec = compile_game_spec(match.tournament)
+    
+    # Noise and match length come from a per-match stream, so a resumed match replays them
+    rng = game_spec.match_rng(match_id)
+    match_length = game_spec.match_length(rng, round_count)
     
     # Get agents
     agent_a = db_session.query(Agent).filter(Agent.id == match.agent_a_id).first()
     agent_b = db_session.query(Agent).filter(Agent.id == match.agent_b_id).first()
     
     if agent_a is None or agent_b is None:
-        return
+        return False
     
     # Initialize scores
     agent_a_total_score = 0
@@ -181,58 +293,119 @@ async def execute_match(match_id: int, round_count: int, db_session: Session):
     existing_rounds = db_session.query(Round).filter(Round.match_id == match_id).order_by(Round.round_number).all()
     start_round = len(existing_rounds)
     
-    # Prepare history for both agents
-    history_a = []
-    history_b = []
+    # Integer-encoded transcript for the scoring kernel, and response times
+    # in ms (NaN for rounds that didn't call the agent) for the match summary
+    moves_a = bytearray()
+    moves_b = bytearray()
+    times_a = array("f")
+    times_b = array("f")
     
-    # Add existing rounds to history
+    # Rounds where an agent was called but failed to answer, so DEFECT was played for it
+    failed_a = set()
+    failed_b = set()
+    
+    # Add existing rounds to the transcript
     for round_obj in existing_rounds:
-        history_a.append({
-            "self": round_obj.agent_a_move,
-            "opponent": round_obj.agent_b_move
-        })
-        history_b.append({
-            "self": round_obj.agent_b_move,
-            "opponent": round_obj.agent_a_move
-        })
+        moves_a.append(MOVE_INDEX[round_obj.agent_a_move])
+        moves_b.append(MOVE_INDEX[round_obj.agent_b_move])
+        times_a.append(_time_or_nan(round_obj.agent_a_response_time))
+        times_b.append(_time_or_nan(round_obj.agent_b_response_time))
+        game_spec.apply_noise(rng, 0)
+        game_spec.apply_noise(rng, 0)
         
         agent_a_total_score += round_obj.agent_a_score
         agent_b_total_score += round_obj.agent_b_score
     
+    # Deterministic agents with a known transcript are replayed instead of called,
+    # except for a sample that is played live to verify the cache
+    memo_key = transcript_key(agent_a, agent_b, game_spec, round_count) if start_round == 0 else None
+    cached_transcript = lookup_transcript(db_session, memo_key) if memo_key is not None else None
+    if cached_transcript is not None and not should_verify():
+        moves_a, moves_b = bytearray(cached_transcript[0]), bytearray(cached_transcript[1])
+        agent_a_total_score, agent_b_total_score = _insert_rounds(db_session, match, game_spec, moves_a, moves_b, 0)
+        start_round = len(moves_a)
+        times_a.extend([math.nan] * start_round)
+        times_b.extend([math.nan] * start_round)
+        memo_key = None
+        if on_round is not None:
+            on_round(start_round)
+    
+    # Agents with a state machine strategy are run here rather than called
+    fsm_a = agent_fsm(agent_a)
+    fsm_b = agent_fsm(agent_b)
+    state_a = fsm_a.advance(moves_b) if fsm_a is not None else None
+    state_b = fsm_b.advance(moves_a) if fsm_b is not None else None
+    
+    # Each agent's request body, with its history pre-encoded
+    request_a = play_request_encoder(agent_a, fsm_a, match_id, moves_a, moves_b)
+    request_b = play_request_encoder(agent_b, fsm_b, match_id, moves_b, moves_a)
+    
+    # Two state machines play the rest of the match without leaving this loop
+    if fsm_a is not None and fsm_b is not None and start_round < match_length:
+        played_a, played_b = play_machines(
+            fsm_a, fsm_b, state_a, state_b, match_length - start_round, game_spec, rng
+        )
+        played_score_a, played_score_b = _insert_rounds(db_session, match, game_spec, played_a, played_b, start_round)
+        agent_a_total_score += played_score_a
+        agent_b_total_score += played_score_b
+        moves_a += played_a
+        moves_b += played_b
+        times_a.extend([math.nan] * len(played_a))
+        times_b.extend([math.nan] * len(played_b))
+        if on_round is not None:
+            on_round(match_length - start_round)
+        start_round = match_length
+    
+    # Pending lookahead policies returned by agents that opted in
+    policy_a = None
+    policy_b = None
+    
     # Run remaining rounds
-    for round_num in range(start_round, round_count):
-        # Prepare requests for both agents
-        request_a = {
-            "match_id": str(match_id),
-            "round": round_num,
-            "history": history_a
-        }
+    for round_num in range(start_round, match_length):
+        # Get moves from agents (with timeout); moves are simultaneous, so ask both at once.
+        # Rounds covered by an agent's pending policy are resolved locally.
+        (agent_a_move, agent_a_time, policy_a), (agent_b_move, agent_b_time, policy_b) = await asyncio.gather(
+            resolve_move(agent_a, fsm_a, state_a, policy_step(policy_a, moves_b), round_num, request_a),
+            resolve_move(agent_b, fsm_b, state_b, policy_step(policy_b, moves_a), round_num, request_b)
+        )
         
-        request_b = {
-            "match_id": str(match_id),
-            "round": round_num,
-            "history": history_b
-        }
+        if agent_a_move is None:
+            failed_a.add(round_num)
+        if agent_b_move is None:
+            failed_b.add(round_num)
         
-        # Get moves from agents (with timeout)
-        agent_a_move, agent_a_time = await get_agent_move(agent_a, request_a)
-        agent_b_move, agent_b_time = await get_agent_move(agent_b, request_b)
+        # Apply noise to the chosen moves; the flipped move is what gets played
+        intended_a = MOVE_INDEX.get(agent_a_move, DEFECT)
+        intended_b = MOVE_INDEX.get(agent_b_move, DEFECT)
+        move_a = game_spec.apply_noise(rng, intended_a)
+        move_b = game_spec.apply_noise(rng, intended_b)
+        agent_a_move = MOVES[move_a]
+        agent_b_move = MOVES[move_b]
         
-        # Calculate scores based on payoff matrix
-        agent_a_score, agent_b_score = PAYOFF_MATRIX.get(
-            (agent_a_move, agent_b_move),
-            (1, 1)  # Default if something goes wrong
-        )
+        # A policy assumes its own moves were played as chosen; a flip invalidates it
+        if move_a != intended_a:
+            policy_a = None
+        if move_b != intended_b:
+            policy_b = None
+        moves_a.append(move_a)
+        moves_b.append(move_b)
+        times_a.append(_time_or_nan(agent_a_time))
+        times_b.append(_time_or_nan(agent_b_time))
+        
+        # State machines move on the opponent's played move
+        if fsm_a is not None:
+            state_a = fsm_a.transitions[state_a * 2 + move_b]
+        if fsm_b is not None:
+            state_b = fsm_b.transitions[state_b * 2 + move_a]
+        
+        # Calculate scores based on the compiled payoff table
+        agent_a_score, agent_b_score = game_spec.score(move_a, move_b)
         
         # Update history
-        history_a.append({
-            "self": agent_a_move,
-            "opponent": agent_b_move
-        })
-        history_b.append({
-            "self": agent_b_move,
-            "opponent": agent_a_move
-        })
+        if request_a is not None:
+            request_a.append(move_a, move_b)
+        if request_b is not None:
+            request_b.append(move_b, move_a)
         
         # Update total scores
         agent_a_total_score += agent_a_score
@@ -240,6 +413,7 @@ async def execute_match(match_id: int, round_count: int, db_session: Session):
         
         # Create round record
         round_obj = Round(
+            tournament_id=match.tournament_id,
             match_id=match_id,
             round_number=round_num,
             agent_a_move=agent_a_move,
@@ -255,6 +429,23 @@ async def execute_match(match_id: int, round_count: int, db_session: Session):
         # Update match progress
         match.rounds_completed = round_num + 1
         db_session.commit()
+        
+        if on_round is not None:
+            on_round(1)
+        
+        event_hub.publish(match_topic(match_id), "round", {
+            "match_id": match_id,
+            "round_number": round_num,
+            "agent_a_move": agent_a_move,
+            "agent_b_move": agent_b_move,
+            "agent_a_score": agent_a_score,
+            "agent_b_score": agent_b_score,
+            "agent_a_total_score": agent_a_total_score,
+            "agent_b_total_score": agent_b_total_score
+        })
+    
+    # Final scores come from one vectorized pass over the whole transcript
+    agent_a_total_score, agent_b_total_score = game_spec.score_transcript(moves_a, moves_b)
     
     # Mark match as complete
     match.is_complete = True
@@ -262,58 +453,180 @@ async def execute_match(match_id: int, round_count: int, db_session: Session):
     match.agent_b_score = agent_b_total_score
     match.completed_at = datetime.now()
     
-    # Update agent stats
-    agent_a.total_matches += 1
-    agent_a.total_score += agent_a_total_score
-    agent_a.average_score = agent_a.total_score / agent_a.total_matches
-    
-    agent_b.total_matches += 1
-    agent_b.total_score += agent_b_total_score
-    agent_b.average_score = agent_b.total_score / agent_b.total_matches
+    # Record agent stats in the append-only ledger; the stats aggregator
+    # rolls them into the Agent columns without locking hot agent rows here
+    db_session.add(AgentMatchStat(
+        agent_id=agent_a.id, match_id=match_id, score=agent_a_total_score,
+        **summarize_agent_match(moves_a, times_a, len(failed_a))
+    ))
+    db_session.add(AgentMatchStat(
+        agent_id=agent_b.id, match_id=match_id, score=agent_b_total_score,
+        **summarize_agent_match(moves_b, times_b, len(failed_b))
+    ))
     
     db_session.commit()
+    
+    # A transcript with failed calls isn't what the agents would play, so it is never cached
+    if memo_key is not None:
+        if cached_transcript is not None:
+            verify_transcript(db_session, memo_key, cached_transcript, moves_a, moves_b,
+                              agent_a, agent_b, failed_a, failed_b)
+        elif not failed_a and not failed_b:
+            store_transcript(db_session, memo_key, moves_a, moves_b)
+    
+    head_to_head_cache.record_match(
+        match.tournament_id, match_id, agent_a.id, agent_b.id,
+        agent_a_total_score, agent_b_total_score, moves_a, moves_b
+    )
+    
+    completed_data = _match_completed_data(match)
+    event_hub.publish(match_topic(match_id), "match_completed", completed_data)
+    event_hub.publish(tournament_topic(match.tournament_id), "match_completed", completed_data)
+    return True
 
-async def get_agent_move(agent, request_data):
+def agent_fsm(agent):
     """
-    Get a move from an agent with timeout.
-    Returns the move and response time in milliseconds.
-    Defaults to DEFECT if timeout or error.
+    The agent's compiled state machine strategy, or None if it plays over HTTP.
     """
-    start_time = time.time()
     try:
-        # Set timeout to 200ms as per spec
-        timeout = 0.2  # seconds
-        
-        # Prepare headers with auth token
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {agent.auth_token}"
+        return compile_fsm(agent.strategy_fsm)
+    except FsmError:
+        # Validated on upload; anything else falls back to calling the agent
+        return None
+
+def _time_or_nan(response_time: Optional[float]) -> float:
+    return math.nan if response_time is None else response_time
+
+def play_request_encoder(agent, fsm, match_id: int, own_moves: bytes, opponent_moves: bytes):
+    """
+    Request encoder for an agent that is called over HTTP, primed with the
+    rounds played so far; None for state machine agents.
+    """
+    if fsm is not None:
+        return None
+    encoder = PlayRequestEncoder(match_id, agent.max_lookahead)
+    for own_move, opponent_move in zip(own_moves, opponent_moves):
+        encoder.append(own_move, opponent_move)
+    return encoder
+
+async def resolve_move(agent, fsm, state, step, round_num: int, encoder: Optional[PlayRequestEncoder]):
+    """
+    Get an agent's move for a round: from its state machine, from its pending
+    policy if it covers the round, otherwise from the agent itself.
+    Returns (move, response time in ms or None, pending policy); the move is
+    None if the agent failed to answer.
+    """
+    if fsm is not None:
+        return MOVES[fsm.outputs[state]], None, None
+    if step is not None:
+        move, policy = step
+        return MOVES[move], None, policy
+    return await get_agent_move(agent, encoder.body(round_num), encoder.idempotency_key(round_num))
+
+def _insert_rounds(db_session: Session, match: Match, game_spec: GameSpec,
+                   moves_a: bytes, moves_b: bytes, first_round: int):
+    """
+    Store an already-known stretch of the transcript as the match's rounds
+    without calling either agent. Returns the stretch's scores for each agent.
+    """
+    db_session.bulk_insert_mappings(Round, [
+        {
+            "tournament_id": match.tournament_id,
+            "match_id": match.id,
+            "round_number": round_num,
+            "agent_a_move": MOVES[move_a],
+            "agent_b_move": MOVES[move_b],
+            "agent_a_score": game_spec.payoff_a[move_a * 2 + move_b],
+            "agent_b_score": game_spec.payoff_b[move_a * 2 + move_b],
+            "agent_a_response_time": None,
+            "agent_b_response_time": None
         }
-        
-        # Make request to agent's callback URL
-        response = requests.post(
-            agent.callback_url,
-            headers=headers,
-            data=json.dumps(request_data),
-            timeout=timeout
-        )
-        
-        end_time = time.time()
-        response_time = (end_time - start_time) * 1000  # convert to ms
-        
-        if response.status_code == 200:
-            response_data = response.json()
-            move = response_data.get("move", MoveType.DEFECT)
+        for round_num, (move_a, move_b) in enumerate(zip(moves_a, moves_b), first_round)
+    ])
+    match.rounds_completed = first_round + len(moves_a)
+    db_session.commit()
+    return game_spec.score_transcript(moves_a, moves_b)
+
+def _match_completed_event(match_id: int):
+    """
+    The final result of an already finished match as a stream event, else None.
+    Read with a session of its own once the stream is subscribed.
+    """
+    db = SessionLocal()
+    try:
+        match = db.query(Match).filter(Match.id == match_id).first()
+        if match is None or not match.is_complete:
+            return None
+        return {"event": "match_completed", "data": _match_completed_data(match)}
+    finally:
+        db.close()
+
+def _match_completed_data(match: Match):
+    return {
+        "match_id": match.id,
+        "tournament_id": match.tournament_id,
+        "agent_a_id": match.agent_a_id,
+        "agent_b_id": match.agent_b_id,
+        "agent_a_score": match.agent_a_score,
+        "agent_b_score": match.agent_b_score,
+        "rounds_completed": match.rounds_completed,
+        "completed_at": match.completed_at
+    }
+
+async def get_agent_move(agent, content: bytes, idempotency_key: str):
+    """
+    Get a move from an agent with timeout, given the encoded play request.
+    Returns the move, response time in milliseconds, and the lookahead
+    policy the agent attached (None unless it opted in and sent a valid one).
+    The move is None if the agent timed out, errored or sent an invalid
+    move; callers play DEFECT for it.
+    Waits for the agent's in-flight cap and pacing before sending; the wait
+    is not counted against the timeout or the response time. A slow request
+    may be hedged with a duplicate (see AgentTransport.post_hedged).
+    """
+    async with agent_transport.limiter(agent).slot():
+        start_time = time.time()
+        try:
+            # Set timeout to 200ms as per spec
+            timeout = AGENT_RESPONSE_TIMEOUT
             
-            # Validate move
-            if move not in [MoveType.COOPERATE, MoveType.DEFECT]:
-                move = MoveType.DEFECT
-                
-            return move, response_time
-        else:
-            return MoveType.DEFECT, response_time
+            # Prepare headers with auth token; a hedged duplicate carries the same idempotency key
+            headers = {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {agent.auth_token}",
+                "Idempotency-Key": idempotency_key
+            }
             
-    except (requests.RequestException, json.JSONDecodeError, KeyError):
-        end_time = time.time()
-        response_time = (end_time - start_time) * 1000  # convert to ms
-        return MoveType.DEFECT, response_time
+            # Make request to agent's callback URL
+            response = await agent_transport.post_hedged(
+                agent,
+                content=content,
+                headers=headers,
+                timeout=timeout
+            )
+            
+            end_time = time.time()
+            response_time = (end_time - start_time) * 1000  # convert to ms
+            
+            if response.status_code == 200:
+                response_data = response.json()
+                move = response_data.get("move")
+                
+                # Validate move
+                if move not in [MoveType.COOPERATE, MoveType.DEFECT]:
+                    return None, response_time, None
+                
+                # A malformed policy is ignored; the move itself still counts
+                try:
+                    policy = parse_policy(response_data.get("policy"), agent.max_lookahead or 0)
+                except PolicyError:
+                    policy = None
+                    
+                return move, response_time, policy
+            else:
+                return None, response_time, None
+                
+        except (httpx.HTTPError, json.JSONDecodeError, KeyError, AttributeError):
+            end_time = time.time()
+            response_time = (end_time - start_time) * 1000  # convert to ms
+            return None, response_time, None
@@ -1,15 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 
-from app.db.database import get_db
+from app.db.database import SessionLocal, get_db, get_read_db
 from app.models.models import Tournament, Match, Agent
-from app.schemas.schemas import TournamentCreate, TournamentResponse, MatchResponse
+from app.schemas.schemas import (
+    TournamentCreate, TournamentResponse, MatchResponse, RescoreRequest, RescoreResponse,
+    TournamentPlanRequest, TournamentPlanResponse, EcologyRequest, EcologyResponse
+)
 from app.routers.auth import get_current_active_user
+from app.core.loop_monitor import shed_when_overloaded
+from app.core.events import event_hub, sse_response, tournament_topic
+from app.core.tournament_engine import tournament_engine, round_robin_pairings
+from app.core.game import GameSpec
+from app.core.rescoring import rescore_tournament
+from app.core.archive import archive_tournament
+from app.core.planner import plan_tournament
+from app.core.head_to_head import head_to_head_cache
+from app.core.ecology import simulate_ecology
+from app.db.partitions import ensure_rounds_partition
 
 router = APIRouter()
 
+def _validate_game_spec(tournament: TournamentCreate):
+    """
+    Reject game settings that can't be compiled into a GameSpec.
+    """
+    try:
+        GameSpec(
+            payoff_matrix=tournament.payoff_matrix,
+            noise_probability=tournament.noise_probability,
+            continuation_probability=tournament.continuation_probability
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 @router.post("", response_model=TournamentResponse)
 async def create_tournament(
     tournament: TournamentCreate,
@@ -19,14 +48,20 @@ async def create_tournament(
     """
     Create a new tournament.
     """
+    _validate_game_spec(tournament)
     db_tournament = Tournament(
         name=tournament.name,
         description=tournament.description,
         round_count=tournament.round_count,
+        payoff_matrix=tournament.payoff_matrix,
+        noise_probability=tournament.noise_probability,
+        continuation_probability=tournament.continuation_probability,
         is_active=True
     )
     
     db.add(db_tournament)
+    db.flush()
+    ensure_rounds_partition(db, db_tournament.id)
     db.commit()
     db.refresh(db_tournament)
     
@@ -37,11 +72,12 @@ async def get_tournaments(
     skip: int = 0,
     limit: int = 100,
     active_only: bool = False,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get a list of all tournaments.
     Optional filtering for active tournaments only.
+    Served from the read replica when one is configured.
     """
     query = db.query(Tournament)
     if active_only:
@@ -75,6 +111,8 @@ async def update_tournament(
 ):
     """
     Update an existing tournament's details.
+    The game (payoffs, noise, match length) is fixed once play has started,
+    so every match in the tournament is the same game.
     """
     db_tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
     if db_tournament is None:
@@ -83,10 +121,32 @@ async def update_tournament(
             detail="Tournament not found"
         )
     
+    _validate_game_spec(tournament_update)
+    
+    game_changed = (
+        tournament_update.round_count != db_tournament.round_count
+        or tournament_update.payoff_matrix != db_tournament.payoff_matrix
+        or tournament_update.noise_probability != (db_tournament.noise_probability or 0.0)
+        or tournament_update.continuation_probability != db_tournament.continuation_probability
+    )
+    if game_changed:
+        started = db_tournament.start_time is not None or db.query(Match.id).filter(
+            Match.tournament_id == tournament_id,
+            Match.rounds_completed > 0
+        ).first() is not None
+        if started:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="The game settings of a tournament can't be changed once it has started"
+            )
+    
     # Update fields
     db_tournament.name = tournament_update.name
     db_tournament.description = tournament_update.description
     db_tournament.round_count = tournament_update.round_count
+    db_tournament.payoff_matrix = tournament_update.payoff_matrix
+    db_tournament.noise_probability = tournament_update.noise_probability
+    db_tournament.continuation_probability = tournament_update.continuation_probability
     
     db.commit()
     db.refresh(db_tournament)
@@ -177,19 +237,78 @@ async def end_tournament(
     db.commit()
     db.refresh(db_tournament)
     
+    event_hub.publish(tournament_topic(tournament_id), "tournament_completed", {
+        "tournament_id": tournament_id,
+        "end_time": db_tournament.end_time
+    })
+    
     return db_tournament
 
-@router.get("/{tournament_id}/matches", response_model=List[MatchResponse])
+@router.get("/{tournament_id}/status")
+async def get_tournament_status(tournament_id: int):
+    """
+    Get progress for a tournament.
+    Tournaments running in this process are served from in-memory counters.
+    """
+    tournament_status = await tournament_engine.get_tournament_status(tournament_id)
+    if "error" in tournament_status:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tournament not found"
+        )
+    return tournament_status
+
+@router.get("/{tournament_id}/stream")
+async def stream_tournament(
+    tournament_id: int,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Stream live tournament progress as Server-Sent Events.
+    Emits a "match_completed" event per finished match and a final
+    "tournament_completed" event.
+    """
+    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    if tournament is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tournament not found"
+        )
+    
+    return sse_response(
+        request,
+        tournament_topic(tournament_id),
+        terminal_events=("tournament_completed",),
+        snapshot=lambda: _tournament_completed_event(tournament_id)
+    )
+
+def _tournament_completed_event(tournament_id: int):
+    """
+    The completion of an already finished tournament as a stream event, else None.
+    Read with a session of its own once the stream is subscribed.
+    """
+    db = SessionLocal()
+    try:
+        end_time = db.query(Tournament.end_time).filter(Tournament.id == tournament_id).scalar()
+        if end_time is None:
+            return None
+        return {"event": "tournament_completed", "data": {"tournament_id": tournament_id, "end_time": end_time}}
+    finally:
+        db.close()
+
+@router.get("/{tournament_id}/matches", response_model=List[MatchResponse], dependencies=[Depends(shed_when_overloaded)])
 async def get_tournament_matches(
     tournament_id: int,
     skip: int = 0,
     limit: int = 100,
     completed_only: bool = False,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all matches for a specific tournament.
     Optional filtering for completed matches only.
+    Served from the read replica when one is configured.
     """
     # Check if tournament exists
     tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
@@ -237,13 +356,10 @@ async def schedule_tournament_matches(
             detail="Need at least 2 eligible agents to schedule matches"
         )
     
-    # Schedule round-robin matches
+    # Schedule round-robin matches, one pairing round at a time
     matches_created = 0
-    for i in range(len(eligible_agents)):
-        for j in range(i + 1, len(eligible_agents)):
-            agent_a = eligible_agents[i]
-            agent_b = eligible_agents[j]
-            
+    for pairing_round in round_robin_pairings(eligible_agents):
+        for agent_a, agent_b in pairing_round:
             # Create match
             match = Match(
                 tournament_id=tournament_id,
@@ -259,3 +375,169 @@ async def schedule_tournament_matches(
     db.commit()
     
     return {"message": f"Successfully scheduled {matches_created} matches"}
+
+@router.post("/{tournament_id}/plan", response_model=TournamentPlanResponse, dependencies=[Depends(shed_when_overloaded)])
+def plan_tournament_run(
+    tournament_id: int,
+    plan: TournamentPlanRequest,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Dry-run a tournament: match count, estimated wall time and DB write volume,
+    and a recommended concurrency level. No matches are created.
+    """
+    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    if tournament is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tournament not found"
+        )
+    
+    # Same eligibility rule as scheduling
+    eligible_agents = db.query(Agent).filter(
+        Agent.is_active == True,
+        Agent.is_quarantined == False
+    ).all()
+    
+    if len(eligible_agents) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Need at least 2 eligible agents to schedule matches"
+        )
+    
+    try:
+        return plan_tournament(db, tournament, eligible_agents, plan.matchmaking_type, plan.concurrent_matches)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/{tournament_id}/head-to-head", dependencies=[Depends(shed_when_overloaded)])
+def get_head_to_head(
+    tournament_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the N x N head-to-head matrices for a tournament's completed matches:
+    mean per-round payoff and cooperation rate of the row agent against the column agent.
+    Matrices are cached, updated as matches complete, and frozen once the tournament ends.
+    Runs in the threadpool since a cache miss aggregates the tournament's rounds.
+    """
+    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    if tournament is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tournament not found"
+        )
+    
+    h2h = head_to_head_cache.get(db, tournament)
+    return Response(content=h2h.body(tournament_id), media_type="application/json")
+
+@router.post("/{tournament_id}/ecology", response_model=EcologyResponse, dependencies=[Depends(shed_when_overloaded)])
+def run_ecological_simulation(
+    tournament_id: int,
+    ecology: EcologyRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Run an Axelrod-style ecological simulation (replicator dynamics) over a completed
+    tournament's head-to-head payoff matrix. No match is replayed.
+    Returns population shares sampled over the generations.
+    Runs in the threadpool so long simulations don't hold up the event loop.
+    """
+    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    if tournament is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tournament not found"
+        )
+    
+    if tournament.end_time is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tournament has not completed yet"
+        )
+    
+    h2h = head_to_head_cache.get(db, tournament)
+    if not h2h.agent_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tournament has no completed matches"
+        )
+    
+    try:
+        result = simulate_ecology(h2h, ecology.generations, ecology.initial_shares)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    result["tournament_id"] = tournament_id
+    return result
+
+@router.post("/{tournament_id}/rescore", response_model=RescoreResponse, dependencies=[Depends(shed_when_overloaded)])
+def rescore_tournament_matches(
+    tournament_id: int,
+    rescore: RescoreRequest,
+    include_matches: bool = False,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Recompute match scores and standings under an alternative payoff matrix.
+    Uses the stored transcripts only: no agent is called and the stored results are unchanged.
+    Runs in the threadpool since large tournaments take a few seconds.
+    """
+    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    if tournament is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tournament not found"
+        )
+    
+    try:
+        game_spec = GameSpec(payoff_matrix=rescore.payoff_matrix)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return rescore_tournament(db, tournament_id, game_spec, include_matches=include_matches)
+
+@router.post("/{tournament_id}/archive", response_model=TournamentResponse)
+def archive_tournament_rounds(
+    tournament_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Move a completed tournament's rounds out of the hot table into a compressed segment file.
+    Match details and re-scoring keep working from the archive.
+    """
+    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    if tournament is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tournament not found"
+        )
+    
+    if tournament.archived_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tournament is already archived"
+        )
+    
+    try:
+        archive_tournament(db, tournament)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    db.refresh(tournament)
+    return tournament
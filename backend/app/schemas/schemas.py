@@ -3,6 +3,8 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 
+from app.core.policy import MAX_POLICY_DEPTH
+
 class MoveType(str, Enum):
     COOPERATE = "C"
     DEFECT = "D"
@@ -13,6 +15,12 @@ class AgentBase(BaseModel):
     description: Optional[str] = None
     callback_url: str
     auth_token: str
+    max_concurrent_requests: int = Field(4, ge=1, le=64)
+    max_requests_per_second: Optional[float] = Field(None, gt=0)
+    is_deterministic: bool = False
+    strategy_version: Optional[str] = Field(None, max_length=128)
+    max_lookahead: int = Field(0, ge=0, le=MAX_POLICY_DEPTH)
+    strategy_fsm: Optional[Dict[str, Any]] = None
 
 class AgentCreate(AgentBase):
     pass
@@ -30,11 +38,31 @@ class AgentResponse(AgentBase):
     class Config:
         orm_mode = True
 
+class AgentSloEntry(BaseModel):
+    agent_id: int
+    name: str
+    matches: int
+    rounds: int
+    agent_calls: int
+    timeouts: int
+    timeout_rate: float
+    errors: int
+    error_rate: float
+    mean_response_p50: Optional[float]
+    mean_response_p95: Optional[float]
+    worst_response_p95: Optional[float]
+    worst_response: Optional[float]
+    cooperation_rate: Optional[float]
+    meets_slo: bool
+
 # Tournament Schemas
 class TournamentBase(BaseModel):
     name: str
     description: Optional[str] = None
     round_count: int = 200
+    payoff_matrix: Optional[Dict[str, List[int]]] = None
+    noise_probability: float = Field(0.0, ge=0.0, le=0.5)
+    continuation_probability: Optional[float] = Field(None, gt=0.0, lt=1.0)
 
 class TournamentCreate(TournamentBase):
     pass
@@ -45,10 +73,73 @@ class TournamentResponse(TournamentBase):
     end_time: Optional[datetime]
     is_active: bool
     created_at: datetime
+    archived_at: Optional[datetime] = None
 
     class Config:
         orm_mode = True
 
+# Planning Schemas
+class TournamentPlanRequest(BaseModel):
+    matchmaking_type: str = "round_robin"
+    concurrent_matches: int = Field(5, ge=1)
+
+class TournamentPlanResponse(BaseModel):
+    tournament_id: int
+    matchmaking_type: str
+    agent_count: int
+    match_count: int
+    expected_rounds_per_match: float
+    concurrent_matches: int
+    estimated_seconds: float
+    estimated_seconds_at_recommended: float
+    recommended_concurrent_matches: int
+    agents_without_history: int
+    db_rows_written: int
+    db_commits: int
+    db_bytes_written: int
+
+# Ecology Schemas
+class EcologyRequest(BaseModel):
+    generations: int = Field(1000, ge=1, le=100000)
+    initial_shares: Optional[Dict[int, float]] = None
+
+class EcologyAgent(BaseModel):
+    id: int
+    name: Optional[str]
+
+class EcologyResponse(BaseModel):
+    tournament_id: int
+    agents: List[EcologyAgent]
+    generations: List[int]
+    shares: List[List[float]]
+    final_shares: Dict[int, float]
+
+# Re-scoring Schemas
+class RescoreRequest(BaseModel):
+    payoff_matrix: Dict[str, List[int]]
+
+class RescoredMatch(BaseModel):
+    match_id: int
+    agent_a_id: int
+    agent_b_id: int
+    agent_a_score: float
+    agent_b_score: float
+
+class RescoredStanding(BaseModel):
+    rank: int
+    agent_id: int
+    name: Optional[str]
+    matches: int
+    total_score: float
+    average_score: float
+
+class RescoreResponse(BaseModel):
+    tournament_id: int
+    payoff_matrix: Dict[str, List[int]]
+    rounds_scored: int
+    matches: Optional[List[RescoredMatch]]
+    standings: List[RescoredStanding]
+
 # Match Schemas
 class MatchBase(BaseModel):
     tournament_id: int
@@ -75,6 +166,8 @@ class MatchResponse(MatchBase):
     is_complete: bool
     created_at: datetime
     completed_at: Optional[datetime]
+    stage: Optional[int] = None
+    group_number: Optional[int] = None
     rounds: Optional[List[RoundInfo]]
 
     class Config:
@@ -89,9 +182,21 @@ class PlayRequest(BaseModel):
     match_id: str
     round: int
     history: List[HistoryItem] = []
+    lookahead: Optional[int] = None  # only sent to agents that opted in
+
+class PolicyNode(BaseModel):
+    move: MoveType
+    C: Optional["PolicyNode"] = None
+    D: Optional["PolicyNode"] = None
+
+class PolicyBranches(BaseModel):
+    C: Optional[PolicyNode] = None
+    D: Optional[PolicyNode] = None
 
 class PlayResponse(BaseModel):
     move: MoveType
+    # Moves for the next rounds, keyed on the opponent's move in the round just played
+    policy: Optional[PolicyBranches] = None
 
 # User Schemas
 class UserBase(BaseModel):
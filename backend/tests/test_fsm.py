@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from app.core.fsm import FsmError, compile_fsm, play_machines
+from app.core.game import GameSpec
+
+TIT_FOR_TAT = {"states": [
+    {"move": "C", "on_cooperate": 0, "on_defect": 1},
+    {"move": "D", "on_cooperate": 0, "on_defect": 1}
+]}
+GRIM_TRIGGER = {"states": [
+    {"move": "C", "on_cooperate": 0, "on_defect": 1},
+    {"move": "D", "on_cooperate": 1, "on_defect": 1}
+]}
+ALTERNATOR = {"initial_state": 1, "states": [
+    {"move": "C", "on_cooperate": 1, "on_defect": 1},
+    {"move": "D", "on_cooperate": 0, "on_defect": 0}
+]}
+# Defects twice, then mirrors the opponent: a prefix before the joint cycle
+SLOW_START = {"states": [
+    {"move": "D", "on_cooperate": 1, "on_defect": 1},
+    {"move": "D", "on_cooperate": 2, "on_defect": 2},
+    {"move": "C", "on_cooperate": 2, "on_defect": 3},
+    {"move": "D", "on_cooperate": 2, "on_defect": 3}
+]}
+MACHINES = [TIT_FOR_TAT, GRIM_TRIGGER, ALTERNATOR, SLOW_START]
+
+
+def step_by_step(fsm_a, fsm_b, rounds):
+    state_a, state_b = fsm_a.initial_state, fsm_b.initial_state
+    moves_a, moves_b = bytearray(), bytearray()
+    for _ in range(rounds):
+        move_a, move_b = fsm_a.outputs[state_a], fsm_b.outputs[state_b]
+        moves_a.append(move_a)
+        moves_b.append(move_b)
+        state_a = fsm_a.transitions[state_a * 2 + move_b]
+        state_b = fsm_b.transitions[state_b * 2 + move_a]
+    return moves_a, moves_b
+
+
+@pytest.mark.parametrize("raw_a", MACHINES)
+@pytest.mark.parametrize("raw_b", MACHINES)
+@pytest.mark.parametrize("rounds", [0, 1, 3, 200, 1001])
+def test_cycle_shortcut_matches_step_by_step_play(raw_a, raw_b, rounds):
+    fsm_a, fsm_b = compile_fsm(raw_a), compile_fsm(raw_b)
+    played = play_machines(
+        fsm_a, fsm_b, fsm_a.initial_state, fsm_b.initial_state, rounds, GameSpec(), random.Random(0)
+    )
+    assert played == step_by_step(fsm_a, fsm_b, rounds)
+
+
+def test_noisy_play_is_reproducible():
+    fsm = compile_fsm(TIT_FOR_TAT)
+    game_spec = GameSpec(noise_probability=0.1)
+    first = play_machines(fsm, fsm, 0, 0, 500, game_spec, random.Random(3))
+    second = play_machines(fsm, fsm, 0, 0, 500, game_spec, random.Random(3))
+    assert first == second
+    assert 1 in first[0]
+
+
+def test_advance_follows_opponent_moves():
+    fsm = compile_fsm(GRIM_TRIGGER)
+    assert fsm.advance([0, 0, 0]) == 0
+    assert fsm.advance([0, 1, 0]) == 1
+
+
+@pytest.mark.parametrize("raw", [
+    {"states": []},
+    {"states": [{"move": "X", "on_cooperate": 0, "on_defect": 0}]},
+    {"states": [{"move": "C", "on_cooperate": 1, "on_defect": 0}]},
+    {"states": [{"move": "C", "on_cooperate": True, "on_defect": 0}]},
+    {"initial_state": 2, "states": [{"move": "C", "on_cooperate": 0, "on_defect": 0}]},
+    ["not", "an", "object"]
+])
+def test_compile_rejects_malformed_machines(raw):
+    with pytest.raises(FsmError):
+        compile_fsm(raw)
@@ -0,0 +1,34 @@
+from itertools import combinations
+
+import pytest
+
+from app.core.tournament_engine import round_robin_pairings
+
+
+@pytest.mark.parametrize("count", range(2, 10))
+def test_every_pair_meets_exactly_once(count):
+    rounds = round_robin_pairings(list(range(count)))
+    played = [frozenset(pair) for pairs in rounds for pair in pairs]
+    assert sorted(played, key=sorted) == sorted(
+        (frozenset(pair) for pair in combinations(range(count), 2)), key=sorted
+    )
+
+
+@pytest.mark.parametrize("count", range(2, 10))
+def test_nobody_plays_twice_in_a_round(count):
+    rounds = round_robin_pairings(list(range(count)))
+    assert len(rounds) == (count - 1 if count % 2 == 0 else count)
+    for pairs in rounds:
+        seen = [item for pair in pairs for item in pair]
+        assert len(seen) == len(set(seen))
+
+
+def test_sides_are_balanced():
+    rounds = round_robin_pairings(list(range(8)))
+    first_side = sum(1 for pairs in rounds for a, _ in pairs if a == 0)
+    assert abs(first_side - (len(rounds) - first_side)) <= 1
+
+
+def test_fewer_than_two_items_make_no_matches():
+    assert all(not pairs for pairs in round_robin_pairings([1]))
+    assert round_robin_pairings([]) == []
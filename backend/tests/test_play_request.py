@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from app.core.game import COOPERATE, DEFECT, MOVES
+from app.core.play_request import PlayRequestEncoder
+
+
+def reference_body(match_id, round_num, history, lookahead=None):
+    request = {
+        "match_id": str(match_id),
+        "round": round_num,
+        "history": [{"self": MOVES[own], "opponent": MOVES[other]} for own, other in history]
+    }
+    if lookahead:
+        request["lookahead"] = lookahead
+    return json.dumps(request).encode("utf-8")
+
+
+HISTORY = [
+    (COOPERATE, COOPERATE), (COOPERATE, DEFECT), (DEFECT, COOPERATE), (DEFECT, DEFECT),
+    (COOPERATE, COOPERATE), (DEFECT, DEFECT), (COOPERATE, DEFECT)
+]
+
+
+@pytest.mark.parametrize("length", [0, 1, len(HISTORY)])
+@pytest.mark.parametrize("lookahead", [None, 0, 4])
+def test_body_matches_json_dumps(length, lookahead):
+    encoder = PlayRequestEncoder(42, lookahead)
+    for own, other in HISTORY[:length]:
+        encoder.append(own, other)
+    assert encoder.body(length) == reference_body(42, length, HISTORY[:length], lookahead)
+
+
+def test_body_matches_json_dumps_at_every_round():
+    encoder = PlayRequestEncoder(7)
+    for round_num, (own, other) in enumerate(HISTORY):
+        assert encoder.body(round_num) == reference_body(7, round_num, HISTORY[:round_num])
+        encoder.append(own, other)
+
+
+def test_idempotency_key_is_per_match_and_round():
+    encoder = PlayRequestEncoder(42)
+    assert encoder.idempotency_key(3) == "42:3"
+    assert encoder.idempotency_key(3) != PlayRequestEncoder(43).idempotency_key(3)
@@ -0,0 +1,87 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from app.core.scheduler import FairShareScheduler
+
+
+def test_grants_up_to_capacity_then_queues():
+    async def scenario():
+        scheduler = FairShareScheduler(capacity=2)
+        scheduler.register(1)
+        await scheduler.acquire(1)
+        await scheduler.acquire(1)
+        assert scheduler.in_use == 2
+
+        waiting = asyncio.ensure_future(scheduler.acquire(1))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+
+        scheduler.release(1)
+        await asyncio.wait_for(waiting, timeout=1)
+        assert scheduler.in_use == 2
+        assert scheduler.active_matches(1) == 2
+
+    asyncio.run(scenario())
+
+
+def test_free_slots_are_shared_by_weight():
+    async def scenario():
+        scheduler = FairShareScheduler(capacity=1)
+        scheduler.register(1, weight=1.0)
+        scheduler.register(2, weight=2.0)
+        await scheduler.acquire(1)
+
+        grants = []
+
+        async def worker(tournament_id):
+            await scheduler.acquire(tournament_id)
+            grants.append(tournament_id)
+
+        tasks = [asyncio.ensure_future(worker(t)) for t in (1, 2) for _ in range(30)]
+        await asyncio.sleep(0)
+        for _ in range(30):
+            scheduler.release(grants[-1] if grants else 1)
+            await asyncio.sleep(0)
+
+        counts = Counter(grants[:30])
+        assert counts[2] == 2 * counts[1]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+def test_unregister_cancels_waiters():
+    async def scenario():
+        scheduler = FairShareScheduler(capacity=1)
+        scheduler.register(1)
+        await scheduler.acquire(1)
+        waiting = asyncio.ensure_future(scheduler.acquire(1))
+        await asyncio.sleep(0)
+
+        scheduler.unregister(1)
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+    asyncio.run(scenario())
+
+
+def test_acquire_requires_registration():
+    async def scenario():
+        scheduler = FairShareScheduler(capacity=1)
+        with pytest.raises(ValueError):
+            await scheduler.acquire(1)
+        scheduler.register(1)
+        scheduler.unregister(1)
+        with pytest.raises(ValueError):
+            await scheduler.acquire(1)
+
+    asyncio.run(scenario())
+
+
+def test_register_rejects_non_positive_weight():
+    with pytest.raises(ValueError):
+        FairShareScheduler().register(1, weight=0)